@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = """
+    callback: event_meter
+    type: aggregate
+    short_description: Measures how many events and bytes per second the controller sustains
+    description:
+        - Counts every callback event of the playbook and the size of each result once serialized
+          to JSON, the way an event pipeline would ship it.
+        - The final result of a looped task repeats every item's result under C(results), so its
+          size is reported separately as loop_summary_bytes instead of counting the items twice.
+        - At the end of the playbook prints events/s and bytes/s overall and for the busiest
+          second, and optionally writes them as JSON for regression tracking.
+        - Meant to be used with event_firehose.yml, enable with ANSIBLE_CALLBACKS_ENABLED=event_meter.
+    version_added: "2.8"
+    requirements:
+        - enable in configuration
+    options:
+        output:
+            description: File to write the measurements to as JSON. Nothing is written when empty.
+            default: ''
+            env:
+                - name: EVENT_METER_OUTPUT
+            ini:
+                - section: callback_event_meter
+                  key: output
+"""
+
+import collections
+import json
+import os
+import time
+
+from ansible.parsing.ajson import AnsibleJSONEncoder
+from ansible.plugins.callback import CallbackBase
+
+
+class CallbackModule(CallbackBase):
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'event_meter'
+    CALLBACK_NEEDS_WHITELIST = True
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        self._encoder = AnsibleJSONEncoder(separators=(',', ':'), ensure_ascii=False)
+        self._start = None
+        self._counts = collections.Counter()
+        self._events = 0
+        self._bytes = 0
+        self._loop_summary_bytes = 0
+        self._per_second = collections.defaultdict(lambda: [0, 0])
+
+    def _event(self, name, result=None):
+        now = time.time()
+        if self._start is None:
+            self._start = now
+        size = len(self._encoder.encode(result._result).encode('utf-8')) if result is not None else 0
+        if size and isinstance(result._result.get('results'), list):
+            # the items were already counted as runner_item_on_* events
+            self._loop_summary_bytes += size
+            size = 0
+        self._counts[name] += 1
+        self._events += 1
+        self._bytes += size
+        second = self._per_second[int(now - self._start)]
+        second[0] += 1
+        second[1] += size
+
+    def v2_playbook_on_start(self, playbook):
+        self._event('playbook_on_start')
+
+    def v2_playbook_on_play_start(self, play):
+        self._event('playbook_on_play_start')
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        self._event('playbook_on_task_start')
+
+    def v2_playbook_on_handler_task_start(self, task):
+        self._event('playbook_on_handler_task_start')
+
+    def v2_runner_on_start(self, host, task):
+        self._event('runner_on_start')
+
+    def v2_runner_on_ok(self, result):
+        self._event('runner_on_ok', result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._event('runner_on_failed', result)
+
+    def v2_runner_on_skipped(self, result):
+        self._event('runner_on_skipped', result)
+
+    def v2_runner_on_unreachable(self, result):
+        self._event('runner_on_unreachable', result)
+
+    def v2_runner_item_on_ok(self, result):
+        self._event('runner_item_on_ok', result)
+
+    def v2_runner_item_on_failed(self, result):
+        self._event('runner_item_on_failed', result)
+
+    def v2_runner_item_on_skipped(self, result):
+        self._event('runner_item_on_skipped', result)
+
+    def v2_runner_retry(self, result):
+        self._event('runner_retry', result)
+
+    def v2_playbook_on_stats(self, stats):
+        self._event('playbook_on_stats')
+        elapsed = max(time.time() - self._start, 1e-9)
+        measurements = {'elapsed_s': elapsed,
+                        'events': self._events,
+                        'bytes': self._bytes,
+                        'loop_summary_bytes': self._loop_summary_bytes,
+                        'events_per_s': self._events / elapsed,
+                        'bytes_per_s': self._bytes / elapsed,
+                        'peak_events_per_s': max(second[0] for second in self._per_second.values()),
+                        'peak_bytes_per_s': max(second[1] for second in self._per_second.values()),
+                        'event_counts': dict(self._counts)}
+
+        self._display.banner('EVENT METER')
+        self._display.display('%(events)d events, %(bytes)d bytes in %(elapsed_s).2fs: '
+                              '%(events_per_s).1f events/s, %(bytes_per_s).0f bytes/s '
+                              '(busiest second: %(peak_events_per_s)d events, %(peak_bytes_per_s)d bytes), '
+                              '%(loop_summary_bytes)d more bytes in loop results' % measurements)
+
+        output = self.get_option('output')
+        if output:
+            with open(os.path.expanduser(output), 'w') as f:
+                json.dump(measurements, f, indent=2, sort_keys=True)
+            self._display.display('event measurements written to %s' % output)
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = """
+    callback: task_profile
+    type: aggregate
+    short_description: Per host, per task latency trace with controller resource samples
+    description:
+        - Records when every task was queued and when it started and finished on every host,
+          splitting the time into queue wait (task queued for the host until a worker picked
+          the host up) and execution time.
+        - A task counts as queued for a host when it was announced or when the host's previous
+          task finished, whichever is later. With the linear strategy that is the task start,
+          with the free strategy, which announces a task only once, it is when the host got
+          to the task.
+        - Samples the controller's CPU time and RSS in the background while the playbook runs.
+        - At the end of the playbook prints the slowest host/task pairs and optionally writes the
+          whole trace as JSON or CSV.
+        - Enable with ANSIBLE_CALLBACKS_ENABLED=task_profile (callback_whitelist on older ansible).
+    version_added: "2.8"
+    requirements:
+        - enable in configuration
+    options:
+        output:
+            description:
+                - File to write the trace to. Nothing is written when empty.
+                - With the csv format the controller samples go to a second file with a _samples suffix.
+            default: ''
+            env:
+                - name: TASK_PROFILE_OUTPUT
+            ini:
+                - section: callback_task_profile
+                  key: output
+        format:
+            description: Format of the trace file.
+            default: json
+            choices: ['json', 'csv']
+            env:
+                - name: TASK_PROFILE_FORMAT
+            ini:
+                - section: callback_task_profile
+                  key: format
+        top:
+            description: Number of slowest host/task pairs to print at the end of the playbook.
+            type: int
+            default: 10
+            env:
+                - name: TASK_PROFILE_TOP
+            ini:
+                - section: callback_task_profile
+                  key: top
+        sample_interval:
+            description: Seconds between controller CPU/RSS samples, 0 disables sampling.
+            type: float
+            default: 0.5
+            env:
+                - name: TASK_PROFILE_SAMPLE_INTERVAL
+            ini:
+                - section: callback_task_profile
+                  key: sample_interval
+"""
+
+import csv
+import json
+import os
+import resource
+import threading
+import time
+
+from ansible.plugins.callback import CallbackBase
+
+FIELDS = ('host', 'task', 'action', 'path', 'status', 'queued', 'start', 'end', 'queue_wait', 'exec_time')
+SAMPLE_FIELDS = ('time', 'cpu_user', 'cpu_sys', 'rss_kb')
+
+
+def current_rss_kb():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize() // 1024
+    except (IOError, OSError, IndexError, ValueError):
+        # peak rather than current RSS, but the best there is without /proc
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class ResourceSampler(threading.Thread):
+
+    def __init__(self, interval):
+        super(ResourceSampler, self).__init__(name='task_profile_sampler')
+        self.daemon = True
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def sample(self):
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        self.samples.append({'time': time.time(), 'cpu_user': usage.ru_utime, 'cpu_sys': usage.ru_stime,
+                             'rss_kb': current_rss_kb()})
+
+    def run(self):
+        self.sample()
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.sample()
+
+
+class CallbackModule(CallbackBase):
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'task_profile'
+    CALLBACK_NEEDS_WHITELIST = True
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        self._playbook = None
+        self._queued = {}
+        self._host_done = {}
+        self._running = {}
+        self._trace = []
+        self._sampler = None
+
+    def set_options(self, task_keys=None, var_options=None, direct=None):
+        super(CallbackModule, self).set_options(task_keys=task_keys, var_options=var_options, direct=direct)
+        interval = self.get_option('sample_interval')
+        if interval > 0 and self._sampler is None:
+            self._sampler = ResourceSampler(interval)
+            self._sampler.start()
+
+    def v2_playbook_on_start(self, playbook):
+        self._playbook = playbook._file_name
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        # the free strategy announces a task once, when the first host reaches it; _finish
+        # then falls back on when each host finished its previous task
+        self._queued.setdefault(task._uuid, time.time())
+
+    def v2_playbook_on_handler_task_start(self, task):
+        self._queued.setdefault(task._uuid, time.time())
+
+    def v2_runner_on_start(self, host, task):
+        self._running[(host.get_name(), task._uuid)] = time.time()
+
+    def _finish(self, result, status):
+        end = time.time()
+        host = result._host.get_name()
+        task = result._task
+        start = self._running.pop((host, task._uuid), None)
+        queued = self._queued.get(task._uuid)
+        previous = self._host_done.get(host)
+        if previous is not None and (queued is None or previous > queued):
+            queued = previous
+        self._host_done[host] = end
+        if start is None:
+            # no v2_runner_on_start for this result (e.g. unreachable before the worker started)
+            start = queued if queued is not None else end
+        if queued is None:
+            queued = start
+        self._trace.append({'host': host,
+                            'task': task.get_name(),
+                            'action': task.action,
+                            'path': task.get_path(),
+                            'status': status,
+                            'queued': queued,
+                            'start': start,
+                            'end': end,
+                            'queue_wait': max(start - queued, 0.0),
+                            'exec_time': end - start})
+
+    def v2_runner_on_ok(self, result):
+        self._finish(result, 'changed' if result._result.get('changed', False) else 'ok')
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._finish(result, 'ignored' if ignore_errors else 'failed')
+
+    def v2_runner_on_skipped(self, result):
+        self._finish(result, 'skipped')
+
+    def v2_runner_on_unreachable(self, result):
+        self._finish(result, 'unreachable')
+
+    def _write_json(self, path, samples):
+        with open(path, 'w') as f:
+            json.dump({'playbook': self._playbook, 'tasks': self._trace, 'samples': samples}, f,
+                      separators=(',', ':'))
+
+    def _write_csv(self, path, samples):
+        with open(path, 'w') as f:
+            writer = csv.DictWriter(f, FIELDS)
+            writer.writeheader()
+            writer.writerows(self._trace)
+        base, ext = os.path.splitext(path)
+        with open('%s_samples%s' % (base, ext or '.csv'), 'w') as f:
+            writer = csv.DictWriter(f, SAMPLE_FIELDS)
+            writer.writeheader()
+            writer.writerows(samples)
+
+    def v2_playbook_on_stats(self, stats):
+        samples = []
+        if self._sampler is not None:
+            self._sampler.stop()
+            samples = self._sampler.samples
+
+        output = self.get_option('output')
+        if output:
+            output = os.path.expanduser(output)
+            if self.get_option('format') == 'csv':
+                self._write_csv(output, samples)
+            else:
+                self._write_json(output, samples)
+
+        top = sorted(self._trace, key=lambda entry: entry['end'] - entry['queued'], reverse=True)
+        self._display.banner('TASK PROFILE')
+        for entry in top[:self.get_option('top')]:
+            self._display.display('%-30s %-40s wait %8.3fs  exec %8.3fs  %s' % (
+                entry['host'][:30], entry['task'][:40], entry['queue_wait'], entry['exec_time'], entry['status']))
+        if samples:
+            self._display.display('controller: %.2fs user, %.2fs sys, peak RSS %d KB over %d samples' % (
+                samples[-1]['cpu_user'] - samples[0]['cpu_user'], samples[-1]['cpu_sys'] - samples[0]['cpu_sys'],
+                max(sample['rss_kb'] for sample in samples), len(samples)))
+        if output:
+            self._display.display('task profile written to %s' % output)
@@ -1,6 +1,10 @@
 #!/usr/bin/env python
 from argparse import ArgumentParser
-from pprint import pprint
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), 'lib'))
+from inventory_output import add_pretty_argument, dump_inventory  # noqa: E402
 
 inventory = {'group_one': {'hosts': ['group_one_host_0{}'.format(i) for i in range(1, 6)]
                                     + ['group_one_and_two_host_0{}'.format(i) for i in range(1, 6)]
@@ -30,13 +34,14 @@ def parse_args():
     parser.add_argument('--list', dest='list_instances', action='store_true', default=True,
                         help='List instances (default: True)')
     parser.add_argument('--host', dest='requested_host', help='Get all the variables about a specific instance')
+    add_pretty_argument(parser)
     return parser.parse_args()
 
 
 def load_inventory():
     args = parse_args()
     if args.list_instances:
-        pprint(inventory)
+        dump_inventory(inventory, pretty=args.pretty)
 
 
 if __name__ == '__main__':
@@ -2,6 +2,10 @@
 from argparse import ArgumentParser
 from datetime import datetime
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), 'lib'))
+from inventory_output import add_pretty_argument, dump_inventory  # noqa: E402
 
 # This is almost the same as dyn_inventory_test_env.py
 # but it reads from 2 environment variables so that using multiple
@@ -23,13 +27,14 @@ def parse_args():
     parser.add_argument('--list', dest='list_instances', action='store_true', default=True,
                         help='List instances (default: True)')
     parser.add_argument('--host', dest='requested_host', help='Get all the variables about a specific instance')
+    add_pretty_argument(parser)
     return parser.parse_args()
 
 
 def load_inventory():
     args = parse_args()
     if args.list_instances:
-        print(inventory)
+        dump_inventory(inventory, pretty=args.pretty)
 
 
 if __name__ == '__main__':
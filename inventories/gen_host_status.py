@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""Host inventory for gen_host_status.yml at any size.
+
+gen_host_status.yml decides what happens to a host from substrings of its
+name (``_skipped``, ``_changed``, ``_failed``, ``_ignored``, ``_rescued``,
+``_unreachable``), like the hand written for_gen_host_status.ini.  This script
+emits N such hosts with a chosen share of every outcome, the rest ``_ok``:
+
+    ./gen_host_status.py --hosts 20000 --failed 5% --unreachable 1%
+
+Shares are a percentage (``5%``) or a number of hosts (``1000``), and adding
+up to more than --hosts is an error.  Outcomes
+are spread evenly over the host list instead of in blocks, so every batch of
+forks sees the same mix.  Hosts are also grouped by outcome (``status_failed``,
+...) for --limit.  Every option can be set through a GEN_HOST_STATUS_*
+environment variable (GEN_HOST_STATUS_HOSTS, GEN_HOST_STATUS_FAILED, ...)
+since ansible only ever calls inventory scripts with --list or --host.
+"""
+from argparse import ArgumentParser, ArgumentTypeError
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), 'lib'))
+from inventory_output import add_pretty_argument, dump_hostvars, dump_inventory  # noqa: E402
+
+ENV_PREFIX = 'GEN_HOST_STATUS_'
+OUTCOMES = ('skipped', 'changed', 'failed', 'ignored', 'rescued', 'unreachable')
+
+
+def env_default(name, default):
+    return os.environ.get(ENV_PREFIX + name.upper(), default)
+
+
+def share(value):
+    """Parse ``5%`` as a fraction of the hosts and ``100`` as a number of hosts."""
+    try:
+        if value.endswith('%'):
+            return ('%', float(value[:-1]))
+        return ('#', int(value))
+    except ValueError:
+        raise ArgumentTypeError('expected a percentage like 5% or a number of hosts, got {0!r}'.format(value))
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--list', dest='list_instances', action='store_true', default=True,
+                        help='List instances (default: True)')
+    parser.add_argument('--host', dest='requested_host', help='Get all the variables about a specific instance')
+    parser.add_argument('--hosts', type=int, default=int(env_default('hosts', 1000)),
+                        help='Total number of hosts (default: 1000)')
+    for outcome in OUTCOMES:
+        parser.add_argument('--{0}'.format(outcome), type=share, default=share(env_default(outcome, '0')),
+                            help='Share of _{0} hosts, as a percentage or a number of hosts (default: 0)'.format(outcome))
+    parser.add_argument('--unreachable-timeout', type=int, default=int(env_default('unreachable_timeout', 0)),
+                        help='ansible_timeout of the _unreachable hosts, 0 leaves it unset (default: 0)')
+    add_pretty_argument(parser)
+    return parser.parse_args()
+
+
+class HostStatusInventory(object):
+    """Maps host indexes to outcomes arithmetically.
+
+    Host ``i`` lands on position ``i * stride % hosts`` of a list holding every
+    outcome in consecutive runs of its count.  The stride is coprime with the
+    host count, so every position is used exactly once and the outcome counts
+    are exact, while neighbouring hosts land far apart in that list.
+    """
+
+    def __init__(self, hosts=1000, shares=None, unreachable_timeout=0):
+        self.hosts = max(hosts, 0)
+        self.unreachable_timeout = unreachable_timeout
+        requested = []
+        for outcome in OUTCOMES:
+            kind, amount = (shares or {}).get(outcome, ('#', 0))
+            requested.append((outcome, max(self.hosts * amount / 100.0 if kind == '%' else amount, 0)))
+        if sum(amount for _, amount in requested) > self.hosts + 1e-9:
+            raise ValueError('the outcome shares add up to more than the {0} hosts requested: {1}'.format(
+                self.hosts, ', '.join('{0:g} {1}'.format(amount, outcome) for outcome, amount in requested if amount)))
+        counts = dict((outcome, int(round(amount))) for outcome, amount in requested)
+        # shares that fit can still overflow by a host or two through rounding, take those back
+        # from the shares rounded up the most
+        for outcome, amount in sorted(requested, key=lambda pair: pair[1] - round(pair[1])):
+            if sum(counts.values()) <= self.hosts:
+                break
+            if counts[outcome] > amount:
+                counts[outcome] -= 1
+        self.counts = [(outcome, counts[outcome]) for outcome in OUTCOMES]
+        remaining = self.hosts - sum(counts.values())
+        self.counts.append(('ok', remaining))
+        self.stride = self._stride()
+        self.width = len(str(max(self.hosts - 1, 1)))
+
+    @classmethod
+    def from_args(cls, args):
+        return cls(hosts=args.hosts, shares=dict((outcome, getattr(args, outcome)) for outcome in OUTCOMES),
+                   unreachable_timeout=args.unreachable_timeout)
+
+    def _stride(self):
+        stride = max(int(self.hosts * 0.618), 1)
+        while self.hosts > 1 and _gcd(stride, self.hosts) != 1:
+            stride += 1
+        return stride
+
+    def outcome(self, index):
+        position = index * self.stride % self.hosts
+        for outcome, count in self.counts:
+            if position < count:
+                return outcome
+            position -= count
+
+    def host_name(self, index):
+        return 'host_{0:0{1}d}_{2}'.format(index, self.width, self.outcome(index))
+
+    def host_index(self, name):
+        try:
+            index = int(name.split('_')[1]) if name.startswith('host_') else -1
+        except (IndexError, ValueError):
+            return None
+        if 0 <= index < self.hosts and self.host_name(index) == name:
+            return index
+        return None
+
+    def iter_outcome_hosts(self, outcome):
+        for index in range(self.hosts):
+            if self.outcome(index) == outcome:
+                yield self.host_name(index)
+
+    def iter_groups(self):
+        """Yield (name, body) pairs; ``hosts`` bodies are lazy iterators."""
+        for outcome, count in self.counts:
+            if count:
+                yield 'status_{0}'.format(outcome), {'hosts': self.iter_outcome_hosts(outcome)}
+        yield 'all', {'vars': {'host_status_counts': dict(self.counts)}}
+
+    def hostvars(self, index):
+        host_vars = {'host_status': self.outcome(index)}
+        if host_vars['host_status'] == 'unreachable' and self.unreachable_timeout > 0:
+            host_vars['ansible_timeout'] = self.unreachable_timeout
+        return host_vars
+
+    def iter_hostvars(self):
+        for index in range(self.hosts):
+            yield self.host_name(index), self.hostvars(index)
+
+    def host(self, name):
+        index = self.host_index(name)
+        return {} if index is None else self.hostvars(index)
+
+
+def _gcd(a, b):
+    while b:
+        a, b = b, a % b
+    return a
+
+
+def load_inventory():
+    args = parse_args()
+    try:
+        inventory = HostStatusInventory.from_args(args)
+    except ValueError as e:
+        raise SystemExit('{0}: error: {1}'.format(os.path.basename(sys.argv[0]), e))
+    if args.requested_host:
+        dump_hostvars(inventory.host(args.requested_host), pretty=args.pretty)
+    elif args.list_instances:
+        dump_inventory(inventory.iter_groups(), inventory.iter_hostvars(), pretty=args.pretty)
+
+
+if __name__ == '__main__':
+    load_inventory()
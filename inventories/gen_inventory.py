@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+"""Synthetic inventory generator for inventory import scaling tests.
+
+Produces the same shape as dyn_inventory.py (overlapping groups, group vars,
+``all`` vars, an ``ungrouped`` set and ``_meta.hostvars``) at any size, e.g.:
+
+    ./gen_inventory.py --hosts 100000 --groups 500 --overlap 3 --depth 2
+
+Every option can also be set through a GEN_INVENTORY_* environment variable
+(GEN_INVENTORY_HOSTS, GEN_INVENTORY_GROUPS, ...) since ansible only ever calls
+inventory scripts with --list or --host.  Output is deterministic for a given
+set of options and seed.
+"""
+from argparse import ArgumentParser
+import heapq
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), 'lib'))
+from inventory_output import add_pretty_argument, dump_hostvars, dump_inventory  # noqa: E402
+
+ENV_PREFIX = 'GEN_INVENTORY_'
+
+
+def env_default(name, default):
+    return type(default)(os.environ.get(ENV_PREFIX + name.upper(), default))
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--list', dest='list_instances', action='store_true', default=True,
+                        help='List instances (default: True)')
+    parser.add_argument('--host', dest='requested_host', help='Get all the variables about a specific instance')
+    parser.add_argument('--hosts', type=int, default=env_default('hosts', 45),
+                        help='Total number of hosts, ungrouped ones included (default: 45)')
+    parser.add_argument('--groups', type=int, default=env_default('groups', 3),
+                        help='Number of leaf groups holding hosts (default: 3)')
+    parser.add_argument('--overlap', type=int, default=env_default('overlap', 3),
+                        help='Maximum number of leaf groups a single host belongs to (default: 3)')
+    parser.add_argument('--ungrouped', type=int, default=env_default('ungrouped', -1),
+                        help='Number of hosts left in ungrouped (default: a ninth of --hosts)')
+    parser.add_argument('--depth', type=int, default=env_default('depth', 1),
+                        help='Levels of parent groups above the leaf groups, 1 means none (default: 1)')
+    parser.add_argument('--fanout', type=int, default=env_default('fanout', 10),
+                        help='Children per parent group when --depth > 1 (default: 10)')
+    parser.add_argument('--hostvar-size', type=int, default=env_default('hostvar_size', 0),
+                        help='Bytes of random payload added to every host\'s vars (default: 0)')
+    parser.add_argument('--seed', type=int, default=env_default('seed', 0),
+                        help='Seed for the generated payloads (default: 0)')
+    parser.add_argument('--check', action='store_true',
+                        help='Check every grouped host is in as many groups as its span and exit')
+    add_pretty_argument(parser)
+    return parser.parse_args()
+
+
+class SyntheticInventory(object):
+    """Computes group membership and host vars arithmetically from a host index.
+
+    Host ``i`` belongs to leaf groups ``i % groups`` up to ``i % groups + span - 1``
+    (wrapping around), where ``span`` cycles through 1..overlap.  That reproduces
+    the single, pair and triple membership pattern of dyn_inventory.py without
+    holding any host list in memory, so groups and hostvars can be produced
+    lazily and any single host can be answered without generating the rest.
+    """
+
+    def __init__(self, hosts=45, groups=3, overlap=3, ungrouped=-1, depth=1, fanout=10, hostvar_size=0, seed=0):
+        if ungrouped < 0:
+            ungrouped = hosts // 9
+        self.groups = max(groups, 1)
+        self.overlap = max(min(overlap, self.groups), 1)
+        self.ungrouped = min(ungrouped, hosts)
+        self.grouped = hosts - self.ungrouped
+        self.hosts = hosts
+        self.depth = max(depth, 1)
+        self.fanout = max(fanout, 2)
+        self.hostvar_size = hostvar_size
+        self.seed = seed
+        self.width = len(str(max(hosts - 1, 1)))
+
+    @classmethod
+    def from_args(cls, args):
+        return cls(hosts=args.hosts, groups=args.groups, overlap=args.overlap, ungrouped=args.ungrouped,
+                   depth=args.depth, fanout=args.fanout, hostvar_size=args.hostvar_size, seed=args.seed)
+
+    def host_name(self, index):
+        return 'host_{0:0{1}d}'.format(index, self.width)
+
+    def host_index(self, name):
+        try:
+            index = int(name[len('host_'):]) if name.startswith('host_') else -1
+        except ValueError:
+            return None
+        if 0 <= index < self.hosts and self.host_name(index) == name:
+            return index
+        return None
+
+    def group_name(self, index):
+        return 'group_{0}'.format(index)
+
+    def parent_name(self, level, index):
+        return 'group_level_{0}_{1}'.format(level, index)
+
+    def span(self, index):
+        return 1 + (index // self.groups) % self.overlap
+
+    def _stride(self, group, offset):
+        """Indexes whose first group is ``offset`` groups before ``group`` and whose span reaches it."""
+        for index in range((group - offset) % self.groups, self.grouped, self.groups):
+            if self.span(index) > offset:
+                yield index
+
+    def iter_group_hosts(self, group):
+        """Yield the host names of one leaf group in ascending index order."""
+        for index in heapq.merge(*[self._stride(group, offset) for offset in range(self.overlap)]):
+            yield self.host_name(index)
+
+    def check_membership(self):
+        """Raise AssertionError unless every grouped host is in exactly span(i) leaf groups."""
+        seen = [0] * self.grouped
+        for group in range(self.groups):
+            for name in self.iter_group_hosts(group):
+                seen[self.host_index(name)] += 1
+        wrong = [i for i in range(self.grouped) if seen[i] != self.span(i)]
+        assert not wrong, '{0} hosts in the wrong number of groups, first: {1}'.format(
+            len(wrong), ', '.join(self.host_name(i) for i in wrong[:5]))
+
+    def iter_ungrouped_hosts(self):
+        for index in range(self.grouped, self.hosts):
+            yield self.host_name(index)
+
+    def group_vars(self, group):
+        group_vars = {'is_in_{0}'.format(self.group_name(group)): True}
+        if group == 0:
+            group_vars['complex_var'] = [{"dir": "/opt/gwaf/logs",
+                                          "sourcetype": "gwaf",
+                                          "something_else": [1, 2, 3]}]
+        return group_vars
+
+    def iter_parent_groups(self):
+        """Yield (name, children) for every parent level above the leaf groups."""
+        children = [self.group_name(g) for g in range(self.groups)]
+        for level in range(1, self.depth):
+            parents = []
+            for start in range(0, len(children), self.fanout):
+                name = self.parent_name(level, start // self.fanout)
+                parents.append(name)
+                yield name, children[start:start + self.fanout]
+            children = parents
+
+    def iter_groups(self):
+        """Yield (name, body) pairs; ``hosts`` bodies are lazy iterators."""
+        for group in range(self.groups):
+            yield self.group_name(group), {'hosts': self.iter_group_hosts(group), 'vars': self.group_vars(group)}
+        for name, children in self.iter_parent_groups():
+            yield name, {'children': children, 'vars': {'is_in_{0}'.format(name): True}}
+        yield 'all', {'vars': {'ansible_connection': 'local',
+                               'inventories_var': True}}
+        yield 'ungrouped', {'hosts': self.iter_ungrouped_hosts()}
+
+    def hostvars(self, index):
+        name = self.host_name(index)
+        host_vars = {'{0}_has_this_var'.format(name): True}
+        if self.hostvar_size > 0:
+            rng = random.Random('{0}:{1}'.format(self.seed, index))
+            host_vars['payload'] = '%0*x' % (self.hostvar_size, rng.getrandbits(self.hostvar_size * 4))
+        return host_vars
+
+    def iter_hostvars(self):
+        for index in range(self.hosts):
+            yield self.host_name(index), self.hostvars(index)
+
+    def host(self, name):
+        index = self.host_index(name)
+        return {} if index is None else self.hostvars(index)
+
+
+def load_inventory():
+    args = parse_args()
+    inventory = SyntheticInventory.from_args(args)
+    if args.check:
+        inventory.check_membership()
+    elif args.requested_host:
+        dump_hostvars(inventory.host(args.requested_host), pretty=args.pretty)
+    elif args.list_instances:
+        dump_inventory(inventory.iter_groups(), inventory.iter_hostvars(), pretty=args.pretty)
+
+
+if __name__ == '__main__':
+    load_inventory()
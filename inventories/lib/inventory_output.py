@@ -0,0 +1,131 @@
+"""Shared --list/--host output for the inventory scripts under inventories/.
+
+This lives in inventories/lib/ rather than next to the scripts so that a
+directory inventory source does not try to parse it as an inventory; the
+``lib`` directory itself is skipped through inventory_ignore_patterns in
+ansible.cfg (ANSIBLE_INVENTORY_IGNORE_REGEX=^lib$ when running from
+elsewhere).  Every script puts this directory on sys.path, relative to its
+own real path, before importing it, so the scripts are no longer standalone
+files: copy lib/ along with them.
+
+The inventory document is written piece by piece as compact JSON instead of
+being built in memory and serialized in one go: each group is encoded and
+written on its own, ``hosts``/``children`` given as iterators are streamed
+element by element, and ``_meta.hostvars`` is written one host at a time.
+
+Pretty output (indented, sorted keys) is meant for humans looking at small
+inventories and is enabled with --pretty or INVENTORY_PRETTY=1; it has to
+materialize the document to sort it.
+"""
+import json
+import os
+import sys
+
+_encoder = json.JSONEncoder(separators=(',', ':'))
+_pretty_encoder = json.JSONEncoder(sort_keys=True, indent=4, separators=(',', ': '))
+
+# containers that json can encode directly; anything else iterable is streamed as an array
+_PLAIN = (dict, list, tuple, str, bytes, int, float, bool, type(None))
+
+
+def add_pretty_argument(parser):
+    parser.add_argument('--pretty', action='store_true',
+                        default=os.environ.get('INVENTORY_PRETTY', '').lower() in ('1', 'true', 'yes'),
+                        help='Indent and sort the JSON output (default: INVENTORY_PRETTY or False)')
+
+
+def _items(mapping):
+    return mapping.items() if hasattr(mapping, 'items') else mapping
+
+
+def _materialize(value):
+    if hasattr(value, 'items'):
+        return dict((key, _materialize(item)) for key, item in _items(value))
+    if isinstance(value, _PLAIN):
+        return value
+    return list(value)
+
+
+def _write_value(write, value):
+    if isinstance(value, _PLAIN):
+        write(_encoder.encode(value))
+        return
+    write('[')
+    first = True
+    for item in value:
+        if not first:
+            write(',')
+        write(_encoder.encode(item))
+        first = False
+    write(']')
+
+
+def _write_object(write, pairs, write_body):
+    write('{')
+    first = True
+    for key, body in pairs:
+        if not first:
+            write(',')
+        write(_encoder.encode(key))
+        write(':')
+        write_body(write, body)
+        first = False
+    write('}')
+
+
+def _write_encoded(write, value):
+    write(_encoder.encode(value))
+
+
+def _write_group(write, body):
+    if callable(body):
+        body(write)
+    elif hasattr(body, 'items'):
+        _write_object(write, body.items(), _write_value)
+    else:
+        _write_value(write, body)
+
+
+def dump_inventory(groups, hostvars=None, stream=None, pretty=False):
+    """Write a --list document.
+
+    ``groups`` is a mapping or an iterable of (name, body) pairs and ``hostvars``
+    a mapping or iterable of (host, vars) pairs; ``_meta`` is only emitted when
+    ``hostvars`` is not None.
+    """
+    stream = stream or sys.stdout
+    if pretty:
+        inventory = dict((name, _materialize(body)) for name, body in _items(groups))
+        if hostvars is not None:
+            inventory['_meta'] = {'hostvars': dict(_items(hostvars))}
+        stream.write(_pretty_encoder.encode(inventory))
+        stream.write('\n')
+        return
+
+    write = stream.write
+    pairs = _items(groups)
+    if hostvars is not None:
+        pairs = _with_meta(pairs, hostvars)
+    _write_object(write, pairs, _write_group)
+    write('\n')
+
+
+def _with_meta(pairs, hostvars):
+    for pair in pairs:
+        yield pair
+    yield '_meta', _write_meta(hostvars)
+
+
+def _write_meta(hostvars):
+    def write_meta(write):
+        write('{"hostvars":')
+        _write_object(write, _items(hostvars), _write_encoded)
+        write('}')
+    return write_meta
+
+
+def dump_hostvars(host_vars, stream=None, pretty=False):
+    """Write a --host document."""
+    stream = stream or sys.stdout
+    stream.write((_pretty_encoder if pretty else _encoder).encode(host_vars))
+    stream.write('\n')
@@ -1,7 +1,10 @@
 #!/usr/bin/env python
 from argparse import ArgumentParser
-from pprint import pprint
-import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), 'lib'))
+from inventory_output import add_pretty_argument, dump_hostvars, dump_inventory  # noqa: E402
 
 inventory = {'group_one': {'hosts': ['group_one_host_0{}'.format(i) for i in range(1, 6)]
                                     + ['group_one_and_two_host_0{}'.format(i) for i in range(1, 6)]
@@ -28,26 +31,42 @@ hostvars = {'group_one_host_01': {'group_one_host_01_has_this_var': True},
             'group_three_host_01': {'group_three_host_01_has_this_var': True}}
 
 
-def dumps(dct):
-    return json.dumps(dct, sort_keys=True, indent=4, separators=(',', ': '))
-
-
 def parse_args():
     parser = ArgumentParser()
     parser.add_argument('--list', dest='list_instances', action='store_true', default=True,
                         help='List instances (default: True)')
     parser.add_argument('--host', dest='requested_host', help='Get all the variables about a specific instance')
+    parser.add_argument('--hosts-batch', dest='requested_hosts', nargs='+', metavar='HOST',
+                        help='Get the variables of several instances at once, as a {host: vars} mapping. '
+                             'Names may also be comma separated')
+    parser.add_argument('--worker', action='store_true', default=False,
+                        help='Read instance names from stdin, one per line, and answer each with a line of JSON')
+    add_pretty_argument(parser)
     return parser.parse_args()
 
 
+def serve_hostvars(stdin, stdout):
+    for line in iter(stdin.readline, ''):
+        host = line.strip()
+        if not host:
+            continue
+        dump_hostvars(hostvars.get(host, {}), stream=stdout)
+        stdout.flush()
+
+
 def load_inventory():
     args = parse_args()
-    if args.requested_host:
-        print(dumps(hostvars.get(args.requested_host, {})))
+    if args.worker:
+        serve_hostvars(sys.stdin, sys.stdout)
+    elif args.requested_hosts:
+        hosts = [host for names in args.requested_hosts for host in names.split(',') if host]
+        dump_hostvars(dict((host, hostvars.get(host, {})) for host in hosts), pretty=args.pretty)
+    elif args.requested_host:
+        dump_hostvars(hostvars.get(args.requested_host, {}), pretty=args.pretty)
     elif args.list_instances:
-        print(dumps(inventory))
+        dump_inventory(inventory, pretty=args.pretty)
     else:
-        print({})
+        dump_hostvars({}, pretty=args.pretty)
 
 
 if __name__ == '__main__':
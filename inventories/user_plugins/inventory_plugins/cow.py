@@ -8,20 +8,71 @@ DOCUMENTATION = r'''
     description:
         - Ignores whatever you give it
         - Returns inventory containing "moooooo"
+        - Generated inventory can be cached between runs, see the inventory_cache options
+    extends_documentation_fragment:
+        - inventory_cache
+    options:
+        plugin:
+            description: token that ensures this is a source file for the 'cow' plugin.
+            required: True
+            choices: ['cow']
+        generate_delay:
+            description: Seconds spent pretending to talk to a slow source when the cache is cold.
+            type: float
+            default: 0
 '''
 
 EXAMPLES = r'''
     # mooooo
+    plugin: cow
+
+    # slow to generate, but only once per hour
+    plugin: cow
+    generate_delay: 2
+    cache: true
+    cache_plugin: jsonfile
+    cache_connection: /tmp/cow_inventory_cache
+    cache_timeout: 3600
 '''
 
-from ansible.plugins.inventory import BaseInventoryPlugin
+import time
+
+from ansible.plugins.inventory import BaseInventoryPlugin, Cacheable
 
 
-class InventoryModule(BaseInventoryPlugin):
+class InventoryModule(BaseInventoryPlugin, Cacheable):
 
     NAME = 'cow'
 
+    def _generate(self):
+        time.sleep(self.get_option('generate_delay'))
+        return {'moooooo': {}}
+
+    def _populate(self, hosts):
+        for host, host_vars in hosts.items():
+            self.inventory.add_host(host)
+            for name, value in host_vars.items():
+                self.inventory.set_variable(host, name, value)
+
     def parse(self, inventory, loader, host_list, cache=True):
         ''' doesnt parse the inventory file, but claims it did anyway '''
         super(InventoryModule, self).parse(inventory, loader, host_list)
-        self.inventory.add_host('moooooo')
+        self._read_config_data(host_list)
+
+        cache_key = self.get_cache_key(host_list)
+        # cache=False means --flush-cache was given: regenerate and refresh the cache
+        use_cache = self.get_option('cache') and cache
+        update_cache = self.get_option('cache') and not cache
+
+        hosts = None
+        if use_cache:
+            try:
+                hosts = self._cache[cache_key]
+            except KeyError:
+                update_cache = True
+        if hosts is None:
+            hosts = self._generate()
+        if update_cache:
+            self._cache[cache_key] = hosts
+
+        self._populate(hosts)
@@ -2,31 +2,137 @@ from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
 DOCUMENTATION = r'''
-    inventory: cow
+    inventory: fox
     version_added: "2.7"
     short_description: What does the fox say? No one knows, error!
     description:
         - Ignores whatever you give it
         - You will never find out what the fox says
+        - Whatever the fox would have said can be cached, see the inventory_cache options
+        - Can be scaled up to add many hosts and groups carrying large vars before failing, to measure
+          what a failed import costs and whether its partial state is thrown away
+    extends_documentation_fragment:
+        - inventory_cache
+    options:
+        plugin:
+            description: token that ensures this is a source file for the 'fox' plugin.
+            required: True
+            choices: ['fox']
+        host_count:
+            description: Number of hosts to add. The first one is always called C(fox), after I(host_prefix).
+            type: int
+            default: 1
+        group_count:
+            description: Number of groups to spread the hosts across, none when 0.
+            type: int
+            default: 0
+        host_prefix:
+            description:
+                - Prepended to every host and group name, so several sources using this plugin add
+                  distinct hosts and groups instead of the same ones.
+            default: ''
+        var_size:
+            description: Bytes of payload var set on every host and group, none when 0.
+            type: int
+            default: 0
+        fail_after:
+            description:
+                - Number of hosts added before the mystery strikes.
+                - Negative values fail only after every host and group has been added.
+            type: int
+            default: -1
+        fail:
+            description: Set to false to let the fox finish, e.g. to get a baseline for a successful parse.
+            type: bool
+            default: true
 '''
 
 EXAMPLES = r'''
     # plugin: fox
+
+    # add 500 of 10000 hosts, each with 4KiB of vars, then fail
+    plugin: fox
+    host_count: 10000
+    group_count: 100
+    var_size: 4096
+    fail_after: 500
 '''
 
-from ansible.plugins.inventory import BaseInventoryPlugin
+from ansible.plugins.inventory import BaseInventoryPlugin, Cacheable
 
 
 def ancient_mystery():
     raise Exception('Gering-ding-ding-ding-dingeringeding')
 
 
-class InventoryModule(BaseInventoryPlugin):
+class InventoryModule(BaseInventoryPlugin, Cacheable):
 
     NAME = 'fox'
 
+    def _payload(self, size):
+        return {'payload': 'x' * size} if size > 0 else {}
+
+    def _add_group(self, group, group_vars):
+        self.inventory.add_group(group)
+        for name, value in group_vars.items():
+            self.inventory.set_variable(group, name, value)
+
+    def _add_host(self, host, group, host_vars):
+        self.inventory.add_host(host, group=group)
+        for name, value in host_vars.items():
+            self.inventory.set_variable(host, name, value)
+
+    def _generate(self):
+        host_count = self.get_option('host_count')
+        group_count = self.get_option('group_count')
+        prefix = self.get_option('host_prefix') or ''
+        var_size = self.get_option('var_size')
+        fail_after = self.get_option('fail_after') if self.get_option('fail') else None
+
+        # everything added before the mystery strikes stays behind, could be used to test rollback
+        results = {'groups': {}, 'hosts': {}}
+        groups = ['%sden_%d' % (prefix, i) for i in range(group_count)]
+        for group in groups:
+            results['groups'][group] = self._payload(var_size)
+            self._add_group(group, results['groups'][group])
+
+        for i in range(host_count):
+            if i == fail_after:
+                ancient_mystery()
+            host = prefix + ('fox' if i == 0 else 'fox_%d' % i)
+            entry = results['hosts'][host] = {'group': groups[i % group_count] if groups else None,
+                                              'vars': self._payload(var_size)}
+            self._add_host(host, entry['group'], entry['vars'])
+
+        if fail_after is not None:
+            ancient_mystery()
+        return results
+
+    def _populate(self, results):
+        for group, group_vars in results['groups'].items():
+            self._add_group(group, group_vars)
+        for host, entry in results['hosts'].items():
+            self._add_host(host, entry['group'], entry['vars'])
+
     def parse(self, inventory, loader, host_list, cache=True):
         ''' doesnt parse the inventory file, but claims it did anyway '''
         super(InventoryModule, self).parse(inventory, loader, host_list)
-        self.inventory.add_host('fox')  # could be used to test rollback
-        ancient_mystery()
+        self._read_config_data(host_list)
+
+        cache_key = self.get_cache_key(host_list)
+        # cache=False means --flush-cache was given: regenerate and refresh the cache
+        use_cache = self.get_option('cache') and cache
+        update_cache = self.get_option('cache') and not cache
+
+        if use_cache:
+            try:
+                results = self._cache[cache_key]
+            except KeyError:
+                update_cache = True
+            else:
+                self._populate(results)
+                return
+
+        results = self._generate()
+        if update_cache:
+            self._cache[cache_key] = results
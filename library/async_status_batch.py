@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import time
+
+from ansible.module_utils.basic import * # noqa
+
+DOCUMENTATION = '''
+---
+module: async_status_batch
+short_description: Check the status of many async jobs in one module run.
+description:
+    - Batched counterpart of async_status. Instead of one module run per poll per job
+      (async_status with until/retries in a loop), takes every job id at once and reads
+      their job files in a single execution.
+    - While jobs are unfinished and I(timeout) has not passed, checks again after a delay
+      that starts at I(delay) and doubles up to I(max_delay).
+    - Never fails because jobs are unfinished, use the returned lists to decide what to do.
+version_added: "2.3"
+options:
+  jids:
+    description:
+      - Job ids (the C(ansible_job_id) of tasks run with C(poll: 0)) to check.
+    required: true
+  timeout:
+    description:
+      - Seconds to keep checking for unfinished jobs. C(0) checks once.
+    default: 0
+  delay:
+    description:
+      - Seconds to wait before the second check.
+    default: 0.5
+  max_delay:
+    description:
+      - Longest wait between two checks.
+    default: 5
+  cleanup:
+    description:
+      - Remove the job files of finished jobs, like async_status C(mode=cleanup).
+    type: bool
+    default: false
+  async_dir:
+    description:
+      - Directory holding the job files.
+    default: ANSIBLE_ASYNC_DIR or ~/.ansible_async
+requirements: []
+'''
+
+EXAMPLES = '''
+- shell: sleep 5
+  async: 60
+  poll: 0
+  loop: "{{ range(100) | list }}"
+  register: fired
+
+- async_status_batch:
+    jids: "{{ fired.results | map(attribute='ansible_job_id') | list }}"
+    timeout: 60
+  register: jobs
+  failed_when: jobs.pending or jobs.missing
+'''
+
+RETURN = '''
+finished:
+    description: Ids of the jobs that finished.
+    type: list
+pending:
+    description: Ids of the jobs still running when the module gave up.
+    type: list
+missing:
+    description: Ids without a job file.
+    type: list
+failed_jobs:
+    description: Ids of the finished jobs whose result is failed.
+    type: list
+results:
+    description: Result of every finished job, by id.
+    type: dict
+checks:
+    description: How many times the job files were read.
+    type: int
+elapsed:
+    description: Seconds spent checking.
+    type: float
+'''
+
+
+def read_job(path):
+    """Return the job result, None while the job is running, or raises IOError/OSError if there is no job file."""
+    with open(path) as f:
+        content = f.read()
+    try:
+        data = json.loads(content)
+    except ValueError:
+        # an empty or half written file, async_wrapper is still writing it
+        return None
+    if data.get('started') and not data.get('finished'):
+        return None
+    return data
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec = dict(
+            jids=dict(type='list', required=True),
+            timeout=dict(type='float', default=0),
+            delay=dict(type='float', default=0.5),
+            max_delay=dict(type='float', default=5),
+            cleanup=dict(type='bool', default=False),
+            async_dir=dict(type='path')),
+        supports_check_mode=True)
+
+    async_dir = module.params['async_dir'] or os.environ.get('ANSIBLE_ASYNC_DIR', '~/.ansible_async')
+    async_dir = os.path.expanduser(async_dir)
+
+    pending = [str(jid) for jid in module.params['jids']]
+    results = {}
+    missing = []
+    checks = 0
+    delay = module.params['delay']
+    start = time.time()
+    deadline = start + module.params['timeout']
+    while True:
+        checks += 1
+        still_pending = []
+        for jid in pending:
+            try:
+                data = read_job(os.path.join(async_dir, jid))
+            except (IOError, OSError):
+                missing.append(jid)
+                continue
+            if data is None:
+                still_pending.append(jid)
+            else:
+                results[jid] = data
+        pending = still_pending
+        if not pending or time.time() + delay > deadline:
+            break
+        time.sleep(delay)
+        delay = min(delay * 2, module.params['max_delay'])
+
+    if module.params['cleanup'] and not module.check_mode:
+        for jid in results:
+            os.unlink(os.path.join(async_dir, jid))
+
+    module.exit_json(changed=False,
+                     finished=sorted(results),
+                     pending=pending,
+                     missing=missing,
+                     failed_jobs=sorted(jid for jid, data in results.items() if data.get('failed')),
+                     results=results,
+                     checks=checks,
+                     elapsed=time.time() - start)
+
+main()
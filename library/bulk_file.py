@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+
+from ansible.module_utils.basic import * # noqa
+
+DOCUMENTATION = '''
+---
+module: bulk_file
+short_description: Apply state, mode and ownership to many paths in one module run.
+description:
+    - Bulk counterpart of the file module for benchmarking per-item module overhead.
+    - Where a C(file) task with C(with_items) transfers and runs the module once per path,
+      this module gets the whole list and handles it in a single execution.
+    - Only the paths that actually changed are reported back.
+version_added: "2.3"
+options:
+  paths:
+    description:
+      - Paths to manage.
+    required: true
+  state:
+    description:
+      - C(directory) creates missing directories (and their parents), C(touch) creates missing
+        files, C(absent) removes files and directory trees.
+    choices: [directory, touch, absent]
+    default: directory
+  mode:
+    description:
+      - Mode every path should have, as for the file module.
+  owner:
+    description:
+      - Owner every path should have.
+  group:
+    description:
+      - Group every path should have.
+requirements: []
+'''
+
+EXAMPLES = '''
+- bulk_file:
+    paths:
+      - /opt/test/6555b322075c3a2933b422822051c864
+      - /opt/test/c2b5e864be8064373611227c8a6c555d
+    state: directory
+    mode: 0o0700
+'''
+
+RETURN = '''
+changed_paths:
+    description: Paths that were created, removed or had their attributes changed.
+    type: list
+total:
+    description: Number of paths handled.
+    type: int
+'''
+
+
+def ensure_present(module, path, state):
+    if os.path.lexists(path):
+        if state == 'directory' and not os.path.isdir(path):
+            module.fail_json(msg='%s exists and is not a directory' % path, path=path)
+        return False
+    if not module.check_mode:
+        if state == 'directory':
+            os.makedirs(path)
+        else:
+            open(path, 'a').close()
+    return True
+
+
+def ensure_absent(module, path):
+    if not os.path.lexists(path):
+        return False
+    if not module.check_mode:
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        else:
+            os.unlink(path)
+    return True
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec = dict(
+            paths=dict(type='list', required=True),
+            state=dict(choices=['directory', 'touch', 'absent'], default='directory'),
+            mode=dict(type='raw'),
+            owner=dict(),
+            group=dict()),
+        supports_check_mode=True)
+
+    state = module.params['state']
+    changed_paths = []
+    for path in module.params['paths']:
+        path = os.path.expanduser(path)
+        if state == 'absent':
+            changed = ensure_absent(module, path)
+        else:
+            changed = ensure_present(module, path, state)
+            # in check mode a path that would have been created has no attributes to compare yet
+            if os.path.lexists(path):
+                changed = module.set_mode_if_different(path, module.params['mode'], changed)
+                changed = module.set_owner_if_different(path, module.params['owner'], changed)
+                changed = module.set_group_if_different(path, module.params['group'], changed)
+        if changed:
+            changed_paths.append(path)
+
+    module.exit_json(changed=bool(changed_paths), changed_paths=changed_paths, total=len(module.params['paths']))
+
+main()
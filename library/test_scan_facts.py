@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import os
+import random
 
 from ansible.module_utils.basic import * # noqa
 
@@ -11,14 +12,48 @@ module: scan_facts
 short_description: Return sample facts into facts namespace.
 description:
     - Return sample facts into facts namespace.
+    - Optionally adds a deterministic, arbitrarily large C(synthetic) fact to exercise fact storage and caching.
 version_added: "2.3"
 options:
+  keys:
+    description:
+      - Number of top level keys in the C(synthetic) fact. No C(synthetic) fact is returned when 0.
+    default: 0
+  depth:
+    description:
+      - Levels of nested objects under each synthetic key.
+    default: 1
+  list_length:
+    description:
+      - Number of strings in the list at the bottom of each synthetic key.
+    default: 0
+  unicode_ratio:
+    description:
+      - Fraction (0.0 to 1.0) of the generated characters taken from outside ASCII.
+    default: 0.0
+  size:
+    description:
+      - Approximate number of UTF-8 bytes of string data in the C(synthetic) fact, spread evenly across its strings.
+      - When 0 every string is 8 characters long.
+    default: 0
+  seed:
+    description:
+      - Seed for the generated strings, the same options always produce the same facts.
+    default: 0
 requirements: []
 author: Chris Meyers, Christopher Wang
 '''
 
 EXAMPLES = '''
-# Example fact output:
+# About 2MB of facts per host, a third of the characters non-ASCII
+- test_scan_facts:
+    keys: 100
+    depth: 3
+    list_length: 10
+    unicode_ratio: 0.3
+    size: 2000000
+
+# Example fact output without options:
 {
     "ansible_facts": {
         "bool": true,
@@ -44,9 +79,58 @@ EXAMPLES = '''
 }
 '''
 
+UNICODE_ALPHABET = u"鵟犭酜귃ꔀꈛ竳䙭韽ࠔ"
+ASCII_ALPHABET = u"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+
+POOL_SIZE = 4096
+
+
+def string_pool(rng, length, unicode_ratio):
+    # one shuffled pool per module run, sliced and repeated for every string, instead of drawing
+    # each character
+    unicode_count = int(round(length * unicode_ratio))
+    if hasattr(rng, 'choices'):
+        chars = rng.choices(UNICODE_ALPHABET, k=unicode_count) + rng.choices(ASCII_ALPHABET, k=length - unicode_count)
+    else:
+        chars = [rng.choice(UNICODE_ALPHABET) for i in range(unicode_count)]
+        chars += [rng.choice(ASCII_ALPHABET) for i in range(length - unicode_count)]
+    rng.shuffle(chars)
+    return u"".join(chars)
+
+
+def synthetic_facts(keys, depth, list_length, unicode_ratio, size, seed):
+    rng = random.Random(seed)
+    strings = keys * (1 + list_length)
+    bytes_per_char = 1 + 2 * unicode_ratio
+    string_length = max(int(size / bytes_per_char / strings), 1) if size else 8
+    pool = string_pool(rng, min(max(string_length * 2, 1024), POOL_SIZE), unicode_ratio)
+
+    def text():
+        start = rng.randrange(len(pool))
+        rotated = pool[start:] + pool[:start]
+        return (rotated * (string_length // len(rotated) + 1))[:string_length]
+
+    facts = {}
+    for key in range(keys):
+        value = {"string": text(), "list": [text() for i in range(list_length)]}
+        for level in range(depth - 1, 0, -1):
+            value = {"level_%d" % level: value}
+        facts["key_%06d" % key] = value
+    return facts
+
+
 def main():
     module = AnsibleModule(
-        argument_spec = dict())
+        argument_spec = dict(
+            keys=dict(type='int', default=0),
+            depth=dict(type='int', default=1),
+            list_length=dict(type='int', default=0),
+            unicode_ratio=dict(type='float', default=0.0),
+            size=dict(type='int', default=0),
+            seed=dict(type='int', default=0)))
+    if not 0.0 <= module.params['unicode_ratio'] <= 1.0:
+        module.fail_json(msg='unicode_ratio must be between 0.0 and 1.0, got %s' % module.params['unicode_ratio'])
 
     string="abc"
     unicode_string="鵟犭酜귃ꔀꈛ竳䙭韽ࠔ"
@@ -67,6 +151,8 @@ def main():
 
     results = dict(ansible_facts=dict(string=string, unicode_string=unicode_string, int=int, float=float, bool=bool,
                                       null=null, list=list, obj=obj, empty_list=empty_list, empty_obj=empty_obj))
+    if module.params['keys'] > 0:
+        results['ansible_facts']['synthetic'] = synthetic_facts(**module.params)
     module.exit_json(**results)
 
 main()
@@ -9,11 +9,51 @@ DOCUMENTATION = """
     short_description: generate random string
     description:
         - This lookup returns a random string.
+        - Use C(count) with C(query) to get a list of many distinct strings in one call.
+    options:
+      _terms:
+        description: Optional prefixes, C(count) strings are generated for each one.
+        required: False
+      length:
+        description: Length of each generated string, prefix not included.
+        type: int
+        default: 12
+      alphabet:
+        description: Characters to pick from.
+        type: str
+        default: abcdefghijklmnopqrstuvwxyz
+      count:
+        description: Number of strings to generate (per prefix).
+        type: int
+        default: 1
+      seed:
+        description: Seed for reproducible strings. Unseeded strings come from the OS random source.
+        type: int
+      unique:
+        description: Guarantee that the generated strings are distinct from each other.
+        type: bool
+        default: True
+"""
+
+EXAMPLES = """
+- name: one name
+  debug:
+    msg: "{{ lookup('randstr') }}"
+
+- name: a thousand distinct host names
+  debug:
+    msg: "{{ query('randstr', 'host-', count=1000, length=8, alphabet='abcdef0123456789') }}"
+"""
+
+RETURN = """
+  _raw:
+    description: The generated strings, C(count) per prefix.
+    type: list
 """
 from ansible.errors import AnsibleError, AnsibleParserError
 from ansible.plugins.lookup import LookupBase
 
-import string
+import os
 import random
 
 try:
@@ -23,7 +63,69 @@ except ImportError:
     display = Display()
 
 
+def _byte_source(seed):
+    if seed is None:
+        return os.urandom
+    rng = random.Random(seed)
+    return lambda n: rng.getrandbits(8 * n).to_bytes(n, 'little') if n else b''
+
+
+def _translate_strings(alphabet, length, count, random_bytes):
+    """Generate ``count`` strings by mapping random bytes onto ``alphabet`` in bulk.
+
+    Bytes at or above the largest multiple of len(alphabet) are dropped rather
+    than wrapped so every character stays equally likely.
+    """
+    usable = 256 - 256 % len(alphabet)
+    table = bytes(bytearray(ord(alphabet[b % len(alphabet)]) for b in range(256)))
+    rejected = bytes(bytearray(range(usable, 256)))
+    needed = length * count
+    chars = b''
+    while len(chars) < needed:
+        missing = needed - len(chars)
+        chars += random_bytes(missing * 256 // usable + 16).translate(table, rejected)
+    text = chars[:needed].decode('ascii')
+    return [text[i:i + length] for i in range(0, needed, length)]
+
+
+def _choice_strings(alphabet, length, count, seed):
+    rng = random.SystemRandom() if seed is None else random.Random(seed)
+    text = ''.join(rng.choices(alphabet, k=length * count))
+    return [text[i:i + length] for i in range(0, length * count, length)]
+
+
 class LookupModule(LookupBase):
 
+    def _generate(self, alphabet, length, count, seed):
+        if all(ord(c) < 128 for c in alphabet) and len(alphabet) <= 256:
+            return _translate_strings(alphabet, length, count, _byte_source(seed))
+        return _choice_strings(alphabet, length, count, seed)
+
     def run(self, terms, variables=None, **kwargs):
-        return [''.join(random.choice(string.ascii_lowercase) for i in range(12))]
+        self.set_options(var_options=variables, direct=kwargs)
+        length = self.get_option('length')
+        alphabet = ''.join(dict.fromkeys(self.get_option('alphabet')))
+        count = self.get_option('count')
+        seed = self.get_option('seed')
+        prefixes = terms or ['']
+
+        if not alphabet:
+            raise AnsibleParserError('randstr needs a non-empty alphabet')
+        if length < 1 or count < 0:
+            raise AnsibleParserError('randstr needs length >= 1 and count >= 0')
+        total = count * len(prefixes)
+        if self.get_option('unique') and total > len(alphabet) ** length:
+            raise AnsibleError('cannot generate %d distinct strings of length %d from %d characters'
+                               % (total, length, len(alphabet)))
+
+        strings = self._generate(alphabet, length, total, seed)
+        if self.get_option('unique'):
+            distinct = list(dict.fromkeys(strings))
+            attempt = 0
+            while len(distinct) < total:
+                attempt += 1
+                extra_seed = None if seed is None else seed + attempt
+                distinct = list(dict.fromkeys(distinct + self._generate(alphabet, length, total - len(distinct),
+                                                                        extra_seed)))
+            strings = distinct
+        return [prefix + value for prefix, value in zip((p for p in prefixes for _ in range(count)), strings)]
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+"""Compare fact cache backends over the gather/use/clear fact playbooks.
+
+For every backend, host count and fact size the fact lifecycle of this repo
+is run against local-connection hosts from inventories/gen_inventory.py, with
+the cache in a fresh directory (or an emptied Redis database):
+
+* cold_s   -- gather_facts.yml + scan_custom.yml with nothing cached: gathers
+              every host and writes its facts, test_scan_facts adding a
+              synthetic fact of the requested size
+* warm_s   -- gather_facts.yml again with gathering=smart, served from the
+              cache (the memory backend starts empty in every process, so
+              this is a second cold gather there)
+* use_s    -- use_facts.yml --tags custom_facts, reading the cached facts
+* clear_s  -- clear_facts.yml, deleting them again
+* disk_kb  -- size of the cache after the cold run (Redis: used_memory)
+
+With ansible importable, the facts one host left in the cache are then
+written to and read back from every backend in process, once per host, to get
+per-host write_*/read_* latencies without the playbook around them.
+
+Redis is included when the redis python library is installed and either
+--redis-uri answers or a redis-server binary can be started on a free port.
+
+    python utils/bench_fact_cache.py --hosts 10 100 --fact-size 100000 1000000 --results fact_cache.json
+"""
+from argparse import ArgumentParser
+import itertools
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import benchlib
+
+BACKENDS = ('memory', 'jsonfile', 'pickle', 'yaml')
+FILE_BACKENDS = ('jsonfile', 'pickle', 'yaml')
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS) + ['redis'],
+                        help='Cache plugins to compare (default: memory jsonfile pickle yaml redis)')
+    parser.add_argument('--hosts', type=int, nargs='+', default=[10], help='Number of hosts (default: 10)')
+    parser.add_argument('--fact-size', type=int, nargs='+', default=[100000],
+                        help='Bytes of synthetic facts per host, test_scan_facts size (default: 100000)')
+    parser.add_argument('--keys', type=int, default=100, help='test_scan_facts keys (default: 100)')
+    parser.add_argument('--depth', type=int, default=2, help='test_scan_facts depth (default: 2)')
+    parser.add_argument('--list-length', type=int, default=5, help='test_scan_facts list_length (default: 5)')
+    parser.add_argument('--unicode-ratio', type=float, default=0.0,
+                        help='test_scan_facts unicode_ratio (default: 0)')
+    parser.add_argument('--redis-uri', default='127.0.0.1:6379:0',
+                        help='host:port:db of a Redis to use, one is started when it does not answer')
+    parser.add_argument('--redis-plugin', default='community.general.redis',
+                        help='Name of the redis cache plugin (default: community.general.redis)')
+    parser.add_argument('--ansible-playbook', default='ansible-playbook', help='ansible-playbook executable')
+    parser.add_argument('--results', help='Write the measurements as JSON to this file (- for stdout)')
+    return parser.parse_args()
+
+
+class Redis(object):
+    """A reachable Redis: the one at ``uri``, or a redis-server started for the benchmark."""
+
+    def __init__(self, uri):
+        import redis
+        self.process = None
+        host, port, db = (uri.split(':') + ['6379', '0'])[:3]
+        if not self._answers(redis, host, int(port), int(db)):
+            host, port = '127.0.0.1', self._free_port()
+            self.process = subprocess.Popen(['redis-server', '--port', str(port), '--save', '', '--appendonly', 'no'],
+                                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            for _ in range(50):
+                if self._answers(redis, host, port, int(db)):
+                    break
+                time.sleep(0.1)
+            else:
+                self.stop()
+                raise RuntimeError('redis-server did not come up on port %d' % port)
+        self.uri = '%s:%s:%s' % (host, port, db)
+
+    def _answers(self, redis, host, port, db):
+        try:
+            self.client = redis.StrictRedis(host=host, port=port, db=db)
+            return self.client.ping()
+        except redis.exceptions.ConnectionError:
+            return False
+
+    @staticmethod
+    def _free_port():
+        s = socket.socket()
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+        s.close()
+        return port
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait()
+
+
+def start_redis(args):
+    try:
+        return Redis(args.redis_uri)
+    except (ImportError, OSError, RuntimeError) as e:
+        sys.stderr.write('skipping redis: %s\n' % e)
+        return None
+
+
+def disk_kb(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total // 1024
+
+
+def run_cycle(backend, plugin, connection, footprint, hosts, size, args, workdir):
+    env = {'ANSIBLE_CACHE_PLUGIN': plugin,
+           'ANSIBLE_CACHE_PLUGIN_CONNECTION': connection,
+           'ANSIBLE_CACHE_PLUGIN_TIMEOUT': '86400',
+           'ANSIBLE_GATHERING': 'smart',
+           'ANSIBLE_HOST_KEY_CHECKING': 'False',
+           'ANSIBLE_RETRY_FILES_ENABLED': 'False',
+           'GEN_INVENTORY_HOSTS': str(hosts),
+           'GEN_INVENTORY_GROUPS': '1',
+           'GEN_INVENTORY_UNGROUPED': '0'}
+    base = [args.ansible_playbook, '-i', benchlib.repo_path('inventories', 'gen_inventory.py'),
+            '-e', 'ansible_python_interpreter=%s' % sys.executable]
+    scan = ['-e', 'scan_facts_keys=%d' % args.keys, '-e', 'scan_facts_depth=%d' % args.depth,
+            '-e', 'scan_facts_list_length=%d' % args.list_length,
+            '-e', 'scan_facts_unicode_ratio=%s' % args.unicode_ratio, '-e', 'scan_facts_size=%d' % size]
+    steps = (('cold_s', scan + [benchlib.repo_path('gather_facts.yml'), benchlib.repo_path('scan_custom.yml')]),
+             ('warm_s', [benchlib.repo_path('gather_facts.yml')]),
+             ('use_s', ['--tags', 'custom_facts', benchlib.repo_path('use_facts.yml')]),
+             ('clear_s', [benchlib.repo_path('clear_facts.yml')]))
+    row = {'backend': backend, 'hosts': hosts, 'fact_size': size}
+    sample = None
+    for name, extra in steps:
+        if name == 'use_s' and backend == 'memory':
+            # nothing survives the previous process to be used
+            row[name] = None
+            continue
+        run = benchlib.run_measured(base + extra, env=env, cwd=workdir)
+        if run['returncode'] != 0:
+            raise SystemExit('%s failed with rc=%s' % (' '.join(run['cmd']), run['returncode']))
+        row[name] = run['wall_s']
+        if name == 'cold_s':
+            row['disk_kb'] = footprint()
+            if backend == 'jsonfile':
+                sample = sample_facts(connection)
+    return row, sample
+
+
+def sample_facts(connection):
+    """The facts of one host as the jsonfile backend cached them, or None."""
+    for name in sorted(os.listdir(connection)) if os.path.isdir(connection) else []:
+        with open(os.path.join(connection, name)) as f:
+            return json.load(f)
+    return None
+
+
+def cache_latencies(plugin, connection, hosts, facts):
+    """Per-host set() and get() latency of a cache plugin, in process."""
+    from ansible.plugins.loader import cache_loader
+    cache = cache_loader.get(plugin, _uri=connection, _timeout=86400, _prefix='')
+    names = ['host_%06d' % i for i in range(hosts)]
+    writes = []
+    reads = []
+    for name in names:
+        start = time.time()
+        cache.set(name, facts)
+        writes.append(time.time() - start)
+    for name in names:
+        start = time.time()
+        cache.get(name)
+        reads.append(time.time() - start)
+    cache.flush()
+    row = {}
+    for kind, values in (('write', writes), ('read', reads)):
+        summary = benchlib.summarize(values)
+        row.update(('%s_%s_ms' % (kind, key), summary[key] * 1000) for key in ('p50', 'p95', 'max'))
+    return row
+
+
+def main():
+    args = parse_args()
+    redis = start_redis(args) if 'redis' in args.backends else None
+    backends = [backend for backend in args.backends if backend != 'redis' or redis is not None]
+    workdir = tempfile.mkdtemp(prefix='bench_fact_cache_')
+    rows = []
+    try:
+        for hosts, size in itertools.product(args.hosts, args.fact_size):
+            sample = None
+            group = []
+            for backend in backends:
+                connection = os.path.join(workdir, '%s_%d_%d' % (backend, hosts, size))
+                plugin = backend
+                footprint = lambda: disk_kb(connection) if backend in FILE_BACKENDS else None
+                if backend == 'redis':
+                    plugin, connection = args.redis_plugin, redis.uri
+                    footprint = lambda: redis.client.info('memory')['used_memory'] // 1024
+                    redis.client.flushdb()
+                row, facts = run_cycle(backend, plugin, connection, footprint, hosts, size, args, workdir)
+                sample = sample or facts
+                group.append((row, plugin, connection))
+                sys.stderr.write('%(backend)s hosts=%(hosts)s fact_size=%(fact_size)s: cold %(cold_s).2fs, '
+                                 'warm %(warm_s).2fs\n' % row)
+            for row, plugin, connection in group:
+                if sample is not None:
+                    try:
+                        row.update(cache_latencies(plugin, connection, hosts, sample))
+                    except ImportError:
+                        pass
+                rows.append(row)
+    finally:
+        if redis is not None:
+            redis.stop()
+        shutil.rmtree(workdir)
+
+    benchlib.print_table(rows, ['backend', 'hosts', 'fact_size', 'cold_s', 'warm_s', 'use_s', 'clear_s', 'disk_kb',
+                                'write_p50_ms', 'read_p50_ms'])
+    if args.results:
+        benchlib.write_results(args.results, rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""Compare the ways of fetching hostvars from a _meta-less inventory script.
+
+* per-host: one ``--host`` process per host, which is what ansible does for
+  scripts that do not return ``_meta``
+* batch: one ``--hosts-batch`` call for every host, per --repeat round
+* worker: one ``--worker`` process answering host names written to its stdin
+
+    python utils/bench_host_lookup.py --repeat 20 --results host_lookup.json
+"""
+from argparse import ArgumentParser
+import json
+import subprocess
+import sys
+import time
+
+import benchlib
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--script', default=benchlib.repo_path('inventories', 'metaless_dyn_inventory.py'),
+                        help='Inventory script supporting --host, --hosts-batch and --worker')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Query every host of the --list output this many times (default: 1)')
+    parser.add_argument('--results', help='Write the measurements as JSON to this file (- for stdout)')
+    return parser.parse_args()
+
+
+def list_hosts(script):
+    inventory = json.loads(subprocess.check_output([sys.executable, script, '--list']))
+    hosts = set()
+    for name, group in inventory.items():
+        if name != '_meta' and isinstance(group, dict):
+            hosts.update(group.get('hosts', []))
+    return sorted(hosts)
+
+
+def per_host(script, hosts, repeat):
+    answers = {}
+    for _ in range(repeat):
+        for host in hosts:
+            answers[host] = json.loads(subprocess.check_output([sys.executable, script, '--host', host]))
+    return answers
+
+
+def batch(script, hosts, repeat):
+    # one call per round, so every round looks up every host once like the other methods
+    answers = {}
+    for _ in range(repeat):
+        answers = json.loads(subprocess.check_output([sys.executable, script, '--hosts-batch'] + hosts))
+    return answers
+
+
+def worker(script, hosts, repeat):
+    proc = subprocess.Popen([sys.executable, script, '--worker'], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            universal_newlines=True)
+    answers = {}
+    try:
+        for _ in range(repeat):
+            for host in hosts:
+                proc.stdin.write(host + '\n')
+                proc.stdin.flush()
+                answers[host] = json.loads(proc.stdout.readline())
+    finally:
+        proc.stdin.close()
+        proc.wait()
+    return answers
+
+
+def main():
+    args = parse_args()
+    hosts = list_hosts(args.script)
+    lookups = len(hosts) * args.repeat
+    rows = []
+    reference = None
+    for name, method in (('per-host', per_host), ('batch', batch), ('worker', worker)):
+        start = time.time()
+        answers = method(args.script, hosts, args.repeat)
+        wall = time.time() - start
+        if reference is None:
+            reference = answers
+        rows.append({'method': name,
+                     'lookups': lookups,
+                     'wall_s': wall,
+                     'per_lookup_ms': 1000.0 * wall / max(lookups, 1),
+                     'speedup': rows[0]['wall_s'] / wall if rows else 1.0,
+                     'matches_per_host': answers == reference})
+    benchlib.print_table(rows, ['method', 'lookups', 'wall_s', 'per_lookup_ms', 'speedup', 'matches_per_host'])
+    if args.results:
+        benchlib.write_results(args.results, rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+"""Cold versus warm parse time of a cached inventory plugin source.
+
+Each round runs ``ansible-inventory --list`` once with --flush-cache (the
+plugin regenerates and rewrites its cache) and then once without (the plugin
+should be served from the cache).
+
+    python utils/bench_inventory_cache.py --rounds 5 --results inventory_cache.json
+"""
+from argparse import ArgumentParser
+import os
+
+import benchlib
+
+PLUGIN_DIR = benchlib.repo_path('inventories', 'user_plugins')
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--source', default=os.path.join(PLUGIN_DIR, 'cow_cached.yaml'),
+                        help='Inventory source using a cacheable plugin (default: cow_cached.yaml)')
+    parser.add_argument('--rounds', type=int, default=3, help='Cold/warm pairs to run (default: 3)')
+    parser.add_argument('--ansible-inventory', default='ansible-inventory', help='ansible-inventory executable')
+    parser.add_argument('--results', help='Write the measurements as JSON to this file (- for stdout)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    cmd = [args.ansible_inventory, '-i', args.source, '--list', '--playbook-dir', PLUGIN_DIR]
+    runs = {'cold': [], 'warm': []}
+    for _ in range(args.rounds):
+        for kind, extra in (('cold', ['--flush-cache']), ('warm', [])):
+            run = benchlib.run_measured(cmd + extra, cwd=PLUGIN_DIR)
+            if run['returncode'] != 0:
+                raise SystemExit('%s failed with rc=%s' % (' '.join(run['cmd']), run['returncode']))
+            runs[kind].append(run['wall_s'])
+
+    rows = [dict(benchlib.summarize(walls), kind=kind) for kind, walls in sorted(runs.items())]
+    benchlib.print_table(rows, ['kind', 'count', 'min', 'mean', 'p50', 'max'])
+    print('warm saves %.3fs per parse' % (rows[0]['mean'] - rows[1]['mean']))
+    if args.results:
+        benchlib.write_results(args.results, rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""Measure what a failed inventory import wastes, using the fox plugin.
+
+For every failure point the fox adds that many hosts (plus every group) with
+``--var-size`` bytes of vars each and then raises.  A run with ``fail: false``
+gives the cost of the same import succeeding.  Each run reports the wall time
+and peak RSS of ``ansible-inventory --list`` and how many fox hosts survived
+into its output, i.e. whether the partial state of the failed source was
+discarded.  When ansible-inventory itself fails there is no output to look
+at, and both are reported as unknown (None) instead.
+
+    python utils/bench_inventory_rollback.py --hosts 20000 --groups 200 --var-size 4096 \\
+        --fail-after 0 10000 19999 --results rollback.json
+"""
+from argparse import ArgumentParser
+import json
+import os
+import shutil
+import tempfile
+
+import benchlib
+
+PLUGIN_DIR = benchlib.repo_path('inventories', 'user_plugins', 'inventory_plugins')
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--hosts', type=int, default=10000, help='host_count passed to the fox (default: 10000)')
+    parser.add_argument('--groups', type=int, default=100, help='group_count passed to the fox (default: 100)')
+    parser.add_argument('--var-size', type=int, default=4096, help='var_size passed to the fox (default: 4096)')
+    parser.add_argument('--fail-after', type=int, nargs='+', default=None,
+                        help='Failure points to measure, in hosts added (default: 0, half and all of --hosts)')
+    parser.add_argument('--ansible-inventory', default='ansible-inventory', help='ansible-inventory executable')
+    parser.add_argument('--results', help='Write the measurements as JSON to this file (- for stdout)')
+    return parser.parse_args()
+
+
+def write_source(directory, name, options):
+    path = os.path.join(directory, '%s.yaml' % name)
+    with open(path, 'w') as f:
+        f.write('plugin: fox\n')
+        for key, value in sorted(options.items()):
+            f.write('%s: %s\n' % (key, json.dumps(value)))
+    return path
+
+
+def fox_hosts(listing):
+    hosts = set()
+    for name, group in listing.items():
+        if name != '_meta':
+            hosts.update(host for host in group.get('hosts', []) if host == 'fox' or host.startswith('fox_'))
+    return hosts
+
+
+def measure(args, directory, name, options):
+    source = write_source(directory, name, options)
+    output = os.path.join(directory, '%s.json' % name)
+    with open(output, 'w') as out:
+        run = benchlib.run_measured([args.ansible_inventory, '-i', source, '--list'], stdout=out,
+                                    env={'ANSIBLE_INVENTORY_PLUGINS': PLUGIN_DIR})
+    hosts = None
+    if run['returncode'] == 0:
+        with open(output) as f:
+            hosts = len(fox_hosts(json.load(f)))
+    return {'scenario': name,
+            'fail_after': options.get('fail_after'),
+            'returncode': run['returncode'],
+            'wall_s': run['wall_s'],
+            'max_rss_kb': run['max_rss_kb'],
+            'hosts_in_output': hosts}
+
+
+def main():
+    args = parse_args()
+    fail_points = args.fail_after if args.fail_after is not None else [0, args.hosts // 2, args.hosts]
+    base = {'host_count': args.hosts, 'group_count': args.groups, 'var_size': args.var_size}
+    directory = tempfile.mkdtemp(prefix='fox_rollback_')
+    try:
+        rows = [measure(args, directory, 'success', dict(base, fail=False))]
+        for fail_after in fail_points:
+            rows.append(measure(args, directory, 'fail_after_%d' % fail_after, dict(base, fail_after=fail_after)))
+    finally:
+        shutil.rmtree(directory)
+
+    baseline = rows[0]
+    for row in rows[1:]:
+        row['wasted_wall_pct'] = 100.0 * row['wall_s'] / baseline['wall_s'] if baseline['wall_s'] else None
+        # only a listing that was actually parsed can show the partial state was thrown away
+        row['partial_state_discarded'] = row['hosts_in_output'] == 0 if row['hosts_in_output'] is not None else None
+    benchlib.print_table(rows, ['scenario', 'returncode', 'wall_s', 'max_rss_kb', 'hosts_in_output',
+                                'wasted_wall_pct', 'partial_state_discarded'])
+    if args.results:
+        benchlib.write_results(args.results, rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+"""How inventory loading scales with nested directory trees of sources.
+
+For every combination of --depth, --width and --scripts a tree is built with
+utils/gen_inventory_tree.py and loaded with ``ansible-inventory --list``:
+
+* sources    -- inventory sources in the tree
+* scripts_s  -- the scripts run one after the other on their own
+* load_s     -- ansible-inventory on the tree, running every script itself
+* merge_s    -- load_s - scripts_s: parsing, merging and ansible startup
+
+With --concurrent the scripts are also run --jobs at a time up front, their
+output converted to static YAML inventory (as .json) in a copy of the tree,
+and that copy loaded instead; prefetch_s + prefetched_load_s is then the
+total to compare with load_s.
+
+    python utils/bench_inventory_tree.py --depth 2 3 4 --width 3 --scripts 2 --script-delay 0.2 --concurrent
+"""
+from argparse import ArgumentParser, Namespace
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import benchlib
+import gen_inventory_tree
+
+PLUGIN_DIR = benchlib.repo_path('inventories', 'user_plugins', 'inventory_plugins')
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--depth', type=int, nargs='+', default=[2], help='Tree depths (default: 2)')
+    parser.add_argument('--width', type=int, nargs='+', default=[2], help='Subdirectories per directory (default: 2)')
+    parser.add_argument('--scripts', type=int, nargs='+', default=[1], help='Scripts per directory (default: 1)')
+    parser.add_argument('--ini', type=int, default=1, help='INI files per directory (default: 1)')
+    parser.add_argument('--yaml', type=int, default=0, help='YAML files per directory (default: 0)')
+    parser.add_argument('--plugins', type=int, default=0, help='fox plugin configs per directory (default: 0)')
+    parser.add_argument('--hosts', type=int, default=10, help='Hosts per source (default: 10)')
+    parser.add_argument('--groups', type=int, default=2, help='Groups per source (default: 2)')
+    parser.add_argument('--shared', type=int, default=5, help='Hosts every source lists (default: 5)')
+    parser.add_argument('--script-delay', type=float, default=0.0, help='Seconds every script sleeps (default: 0)')
+    parser.add_argument('--concurrent', action='store_true', help='Also prefetch the scripts concurrently')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 4,
+                        help='Scripts run at once with --concurrent (default: CPU count)')
+    parser.add_argument('--ansible-inventory', default='ansible-inventory', help='ansible-inventory executable')
+    parser.add_argument('--results', help='Write the measurements as JSON to this file (- for stdout)')
+    return parser.parse_args()
+
+
+def find_scripts(tree):
+    scripts = []
+    for root, dirs, files in os.walk(tree):
+        dirs.sort()
+        scripts.extend(os.path.join(root, name) for name in sorted(files)
+                       if name.startswith('script_') and name.endswith('.py'))
+    return scripts
+
+
+def run_script(path):
+    return subprocess.check_output([path, '--list'], universal_newlines=True)
+
+
+def script_to_yaml(output):
+    """Convert script --list output into the YAML inventory plugin's format."""
+    data = json.loads(output)
+    hostvars = data.pop('_meta', {}).get('hostvars', {})
+    top = data.pop('all', {})
+    children = {}
+    for group, body in data.items():
+        if isinstance(body, list):
+            body = {'hosts': body}
+        entry = {'hosts': dict((host, None) for host in body.get('hosts', []))}
+        if body.get('vars'):
+            entry['vars'] = body['vars']
+        if body.get('children'):
+            entry['children'] = dict((child, None) for child in body['children'])
+        children[group] = entry
+    return {'all': {'vars': top.get('vars', {}),
+                    'hosts': dict((host, host_vars or None) for host, host_vars in hostvars.items()),
+                    'children': children}}
+
+
+def prefetch(tree, copy, jobs):
+    """Copy ``tree`` to ``copy`` with every script replaced by its output, running ``jobs`` scripts at once."""
+    shutil.copytree(tree, copy)
+    scripts = find_scripts(copy)
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        outputs = list(executor.map(run_script, scripts))
+    for path, output in zip(scripts, outputs):
+        with open(path[:-len('.py')] + '.json', 'w') as f:
+            json.dump(script_to_yaml(output), f)
+        os.unlink(path)
+
+
+def load(tree, args):
+    env = {'ANSIBLE_INVENTORY_PLUGINS': PLUGIN_DIR, 'ANSIBLE_INVENTORY_UNPARSED_FAILED': 'True'}
+    run = benchlib.run_measured([args.ansible_inventory, '-i', tree, '--list'], env=env)
+    if run['returncode'] != 0:
+        raise SystemExit('%s failed with rc=%s' % (' '.join(run['cmd']), run['returncode']))
+    return run
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix='bench_inventory_tree_')
+    rows = []
+    try:
+        for depth, width, scripts in itertools.product(args.depth, args.width, args.scripts):
+            tree = os.path.join(workdir, 'tree_%d_%d_%d' % (depth, width, scripts))
+            options = Namespace(depth=depth, width=width, scripts=scripts, ini=args.ini, yaml=args.yaml,
+                                plugins=args.plugins, hosts=args.hosts, groups=args.groups, shared=args.shared,
+                                script_delay=args.script_delay)
+            sources = gen_inventory_tree.build(tree, [], options)
+
+            script_walls = [benchlib.run_measured([path, '--list'])['wall_s'] for path in find_scripts(tree)]
+            run = load(tree, args)
+            row = {'depth': depth, 'width': width, 'scripts_per_dir': scripts, 'sources': sources,
+                   'scripts': len(script_walls), 'scripts_s': sum(script_walls), 'load_s': run['wall_s'],
+                   'merge_s': run['wall_s'] - sum(script_walls), 'max_rss_kb': run['max_rss_kb']}
+
+            if args.concurrent:
+                start = time.time()
+                prefetch(tree, tree + '_prefetched', args.jobs)
+                row['prefetch_s'] = time.time() - start
+                row['prefetched_load_s'] = load(tree + '_prefetched', args)['wall_s']
+                row['prefetched_total_s'] = row['prefetch_s'] + row['prefetched_load_s']
+            rows.append(row)
+            sys.stderr.write('depth=%(depth)s width=%(width)s scripts=%(scripts_per_dir)s: %(sources)s sources, '
+                             'load %(load_s).2fs\n' % row)
+    finally:
+        shutil.rmtree(workdir)
+
+    columns = ['depth', 'width', 'scripts_per_dir', 'sources', 'scripts_s', 'load_s', 'merge_s', 'max_rss_kb']
+    if args.concurrent:
+        columns += ['prefetch_s', 'prefetched_load_s', 'prefetched_total_s']
+    benchlib.print_table(rows, columns)
+    if args.results:
+        benchlib.write_results(args.results, rows)
+
+
+if __name__ == '__main__':
+    main()
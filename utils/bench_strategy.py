@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""Compare play strategies on the same randomized, reproducible workload.
+
+Runs free_waiter_seeded.yml for every combination of --strategy, --forks and
+--hosts against local-connection hosts from inventories/gen_inventory.py,
+with the strategy set through ANSIBLE_STRATEGY and the task_profile callback
+recording every host/task pair.  From that trace it reports:
+
+* wall_s       -- the whole ansible-playbook run
+* idle_pct     -- share of worker time spent not executing a task, out of
+                  min(forks, hosts) workers over the span from the first task
+                  start to the last task end
+* queue_wait_p95_s -- p95 of the time a host waited for a worker once its
+                  previous task was done and the task was announced
+* host_*_s     -- per host completion time (last task end since the first
+                  task start): p50, p95, p99 and max
+
+    python utils/bench_strategy.py --strategy linear free host_pinned --forks 5 20 \\
+        --hosts 20 100 --seed 7 --results strategies.json
+"""
+from argparse import ArgumentParser
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import benchlib
+
+PLAYBOOK = benchlib.repo_path('free_waiter_seeded.yml')
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--strategy', nargs='+', default=['linear', 'free', 'host_pinned'],
+                        help='Strategies to compare (default: linear free host_pinned)')
+    parser.add_argument('--forks', type=int, nargs='+', default=[5], help='ansible-playbook --forks (default: 5)')
+    parser.add_argument('--hosts', type=int, nargs='+', default=[10], help='Number of hosts (default: 10)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the sleeps (default: 0)')
+    parser.add_argument('--max-sleep', type=float, default=2.0, help='Longest single sleep in seconds (default: 2)')
+    parser.add_argument('--ansible-playbook', default='ansible-playbook', help='ansible-playbook executable')
+    parser.add_argument('--results', help='Write the measurements as JSON to this file (- for stdout)')
+    return parser.parse_args()
+
+
+def analyze(trace, forks, hosts):
+    tasks = trace['tasks']
+    if not tasks:
+        return {}
+    first = min(entry['start'] for entry in tasks)
+    last = max(entry['end'] for entry in tasks)
+    busy = sum(entry['exec_time'] for entry in tasks)
+    workers = max(min(forks, hosts), 1)
+    span = max(last - first, 1e-9)
+    finished = {}
+    for entry in tasks:
+        finished[entry['host']] = max(finished.get(entry['host'], 0.0), entry['end'] - first)
+    completion = list(finished.values())
+    return {'span_s': span,
+            'idle_pct': 100.0 * max(1.0 - busy / (workers * span), 0.0),
+            'queue_wait_p95_s': benchlib.percentile([entry['queue_wait'] for entry in tasks], 95),
+            'host_p50_s': benchlib.percentile(completion, 50),
+            'host_p95_s': benchlib.percentile(completion, 95),
+            'host_p99_s': benchlib.percentile(completion, 99),
+            'host_max_s': max(completion)}
+
+
+def run_one(strategy, forks, hosts, args, workdir):
+    trace_path = os.path.join(workdir, 'trace_%s_%d_%d.json' % (strategy, forks, hosts))
+    env = {'ANSIBLE_STRATEGY': strategy,
+           'ANSIBLE_CALLBACKS_ENABLED': 'task_profile',
+           'ANSIBLE_CALLBACK_WHITELIST': 'task_profile',
+           'ANSIBLE_HOST_KEY_CHECKING': 'False',
+           'ANSIBLE_RETRY_FILES_ENABLED': 'False',
+           'TASK_PROFILE_OUTPUT': trace_path,
+           'TASK_PROFILE_SAMPLE_INTERVAL': '0',
+           'GEN_INVENTORY_HOSTS': str(hosts),
+           'GEN_INVENTORY_GROUPS': '1',
+           'GEN_INVENTORY_UNGROUPED': '0'}
+    cmd = [args.ansible_playbook, '-i', benchlib.repo_path('inventories', 'gen_inventory.py'),
+           '--forks', str(forks), '-e', 'ansible_python_interpreter=%s' % sys.executable,
+           '-e', 'waiter_seed=%d' % args.seed, '-e', 'waiter_max=%s' % args.max_sleep, PLAYBOOK]
+    run = benchlib.run_measured(cmd, env=env, cwd=workdir)
+    if run['returncode'] != 0 or not os.path.exists(trace_path):
+        raise SystemExit('%s failed with rc=%s' % (' '.join(cmd), run['returncode']))
+    with open(trace_path) as f:
+        trace = json.load(f)
+    row = {'strategy': strategy, 'forks': forks, 'hosts': hosts, 'wall_s': run['wall_s']}
+    row.update(analyze(trace, forks, hosts))
+    return row
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix='bench_strategy_')
+    rows = []
+    try:
+        for hosts, forks, strategy in itertools.product(args.hosts, args.forks, args.strategy):
+            row = run_one(strategy, forks, hosts, args, workdir)
+            rows.append(row)
+            sys.stderr.write('%(strategy)s forks=%(forks)s hosts=%(hosts)s: %(wall_s).2fs, '
+                             '%(idle_pct).1f%% idle\n' % row)
+    finally:
+        shutil.rmtree(workdir)
+    benchlib.print_table(rows, ['hosts', 'forks', 'strategy', 'wall_s', 'idle_pct', 'host_p50_s', 'host_p95_s',
+                                'host_p99_s', 'host_max_s'])
+    if args.results:
+        benchlib.write_results(args.results, {'seed': args.seed, 'max_sleep': args.max_sleep, 'rows': rows})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""Per-host render time of templating_benchmark.j2, with and without a compiled-template cache.
+
+Builds the inventory of inventories/gen_inventory.py in process, gets every
+host's variables from a VariableManager (not timed) and renders
+templating_benchmark.j2 for each host three ways:
+
+* templar       -- Templar.template() on the template source, what the
+                   template lookup and the template module do for every host
+* compile_each  -- compile the source in the Templar's environment and render
+                   it, once per host
+* precompiled   -- compile once and only render per host, what caching the
+                   compiled template across hosts would cost
+
+for every combination of --hosts, --loop-items, --filter-rounds and
+--group-lookups.  --hostvar-size makes every host's payload var bigger.
+
+    python utils/bench_templating.py --hosts 100 1000 --groups 20 --group-lookups 1 5 --results templating.json
+"""
+from argparse import ArgumentParser
+import itertools
+import os
+import sys
+import time
+
+from ansible.inventory.manager import InventoryManager
+from ansible.parsing.dataloader import DataLoader
+from ansible.template import Templar
+from ansible.vars.manager import VariableManager
+
+import benchlib
+
+TEMPLATE = benchlib.repo_path('templating_benchmark.j2')
+MODES = ('templar', 'compile_each', 'precompiled')
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--hosts', type=int, nargs='+', default=[100], help='Number of hosts (default: 100)')
+    parser.add_argument('--groups', type=int, default=10, help='gen_inventory.py --groups (default: 10)')
+    parser.add_argument('--hostvar-size', type=int, default=0, help='gen_inventory.py --hostvar-size (default: 0)')
+    parser.add_argument('--loop-items', type=int, nargs='+', default=[50], help='bench_loop_items (default: 50)')
+    parser.add_argument('--filter-rounds', type=int, nargs='+', default=[3], help='bench_filter_rounds (default: 3)')
+    parser.add_argument('--group-lookups', type=int, nargs='+', default=[1],
+                        help='bench_group_lookups, groups whose hosts\' hostvars are read (default: 1)')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES), help='Modes to run (default: all)')
+    parser.add_argument('--results', help='Write the measurements as JSON to this file (- for stdout)')
+    return parser.parse_args()
+
+
+def load_hosts(hosts, args):
+    """Return (loader, [(host name, variables)]) for a gen_inventory.py inventory of ``hosts`` hosts."""
+    os.environ.update({'GEN_INVENTORY_HOSTS': str(hosts),
+                       'GEN_INVENTORY_GROUPS': str(args.groups),
+                       'GEN_INVENTORY_HOSTVAR_SIZE': str(args.hostvar_size)})
+    loader = DataLoader()
+    inventory = InventoryManager(loader=loader, sources=[benchlib.repo_path('inventories', 'gen_inventory.py')])
+    variable_manager = VariableManager(loader=loader, inventory=inventory)
+    return loader, [(host.name, variable_manager.get_vars(host=host)) for host in inventory.get_hosts()]
+
+
+def render_times(mode, source, loader, hosts, extra_vars):
+    templar = Templar(loader=loader)
+    compiled = templar.environment.from_string(source) if mode == 'precompiled' else None
+    timings = []
+    for _, host_vars in hosts:
+        host_vars = dict(host_vars, **extra_vars)
+        start = time.time()
+        if mode == 'templar':
+            templar.available_variables = host_vars
+            templar.template(source, preserve_trailing_newlines=True, convert_data=False, escape_backslashes=False)
+        elif mode == 'compile_each':
+            templar.environment.from_string(source).render(host_vars)
+        else:
+            compiled.render(host_vars)
+        timings.append(time.time() - start)
+    return timings
+
+
+def main():
+    args = parse_args()
+    with open(TEMPLATE) as f:
+        source = f.read()
+
+    rows = []
+    for hosts in args.hosts:
+        loader, host_vars = load_hosts(hosts, args)
+        for loop_items, filter_rounds, group_lookups in itertools.product(args.loop_items, args.filter_rounds,
+                                                                           args.group_lookups):
+            extra_vars = {'bench_loop_items': loop_items, 'bench_filter_rounds': filter_rounds,
+                          'bench_group_lookups': group_lookups}
+            for mode in args.modes:
+                timings = render_times(mode, source, loader, host_vars, extra_vars)
+                summary = benchlib.summarize(timings)
+                row = {'mode': mode, 'hosts': hosts, 'loop_items': loop_items, 'filter_rounds': filter_rounds,
+                       'group_lookups': group_lookups, 'total_s': sum(timings)}
+                row.update(('per_host_%s_ms' % key, summary[key] * 1000) for key in ('mean', 'p50', 'p95', 'max'))
+                rows.append(row)
+                sys.stderr.write('%(mode)s hosts=%(hosts)s loop_items=%(loop_items)s filter_rounds=%(filter_rounds)s '
+                                 'group_lookups=%(group_lookups)s: %(per_host_mean_ms).2fms per host\n' % row)
+
+    benchlib.print_table(rows, ['mode', 'hosts', 'loop_items', 'filter_rounds', 'group_lookups', 'total_s',
+                                'per_host_mean_ms', 'per_host_p95_ms'])
+    if args.results:
+        benchlib.write_results(args.results, rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+"""Bulk object creation throughput against the Tower/AWX API.
+
+Creates inventories, hosts and job launches over a pool of keep-alive
+connections and, for comparison, with a fresh connection per request (what a
+one-module-per-object playbook does).  Without --url a utils/mock_tower.py
+server is started on a free port with the given --latency:
+
+    python utils/bench_tower_api.py --count 2000 --concurrency 16 --latency 0.005
+    python utils/bench_tower_api.py --url https://tower.example.com --username admin --password secret
+"""
+from argparse import ArgumentParser
+import base64
+from concurrent.futures import ThreadPoolExecutor
+import http.client
+import json
+import os
+import queue
+import time
+from urllib.parse import urlencode, urlsplit
+
+import benchlib
+import mock_tower
+
+WORKLOADS = ('inventories', 'hosts', 'launches')
+
+
+class ConnectionPool(object):
+    """Up to ``size`` persistent connections to one Tower, handed out one request at a time.
+
+    With ``keep_alive`` off every request opens its own connection and asks
+    the server to close it, which is what the pool is compared against.
+    """
+
+    def __init__(self, url, username, password, size, keep_alive=True):
+        parts = urlsplit(url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.keep_alive = keep_alive
+        self.headers = {'Content-Type': 'application/json',
+                        'Authorization': 'Basic %s' % base64.b64encode(
+                            ('%s:%s' % (username, password)).encode('utf-8')).decode('ascii')}
+        if not keep_alive:
+            self.headers['Connection'] = 'close'
+        self.idle = queue.LifoQueue()
+        for _ in range(size):
+            self.idle.put(None)
+        self.connections_opened = 0
+
+    def _connect(self):
+        self.connections_opened += 1
+        return self.connection_class(self.netloc, timeout=60)
+
+    def request(self, method, path, data=None):
+        connection = self.idle.get()
+        try:
+            if connection is None or not self.keep_alive:
+                connection = self._connect()
+            body = json.dumps(data) if data is not None else None
+            try:
+                connection.request(method, path, body=body, headers=self.headers)
+                response = connection.getresponse()
+            except (http.client.HTTPException, ConnectionError):
+                # the server closed an idle keep-alive connection, retry once on a new one
+                connection.close()
+                connection = self._connect()
+                connection.request(method, path, body=body, headers=self.headers)
+                response = connection.getresponse()
+            payload = response.read()
+            if not self.keep_alive:
+                connection.close()
+                connection = None
+        except Exception:
+            if connection is not None:
+                connection.close()
+            self.idle.put(None)
+            raise
+        self.idle.put(connection)
+        if response.status >= 400:
+            raise RuntimeError('%s %s returned %d: %s' % (method, path, response.status, payload[:200]))
+        return json.loads(payload.decode('utf-8')) if payload else None
+
+    def close(self):
+        while not self.idle.empty():
+            connection = self.idle.get()
+            if connection is not None:
+                connection.close()
+
+
+def lookup_id(pool, collection, name):
+    results = pool.request('GET', '/api/v2/%s/?%s' % (collection, urlencode({'name': name})))['results']
+    if not results:
+        raise SystemExit('no %s named %r, is this a Tower with the Demo objects?' % (collection, name))
+    return results[0]['id']
+
+
+def wait_for_job(pool, job_id, poll):
+    while True:
+        job = pool.request('GET', '/api/v2/jobs/%d/' % job_id)
+        if job['status'] not in ('new', 'pending', 'waiting', 'running'):
+            return job
+        time.sleep(poll)
+
+
+def run_workload(pool, workload, count, concurrency, label, args):
+    organization = lookup_id(pool, 'organizations', 'Default')
+    if workload == 'hosts':
+        inventory = pool.request('POST', '/api/v2/inventories/', {
+            'name': 'bench_%s_%d' % (label, os.getpid()), 'organization': organization})['id']
+    elif workload == 'launches':
+        template = lookup_id(pool, 'job_templates', args.job_template)
+
+    def one(index):
+        start = time.time()
+        if workload == 'inventories':
+            pool.request('POST', '/api/v2/inventories/', {
+                'name': 'bench_%s_%d_%06d' % (label, os.getpid(), index), 'organization': organization})
+        elif workload == 'hosts':
+            pool.request('POST', '/api/v2/hosts/', {'name': 'bench_host_%06d' % index, 'inventory': inventory})
+        else:
+            job = pool.request('POST', '/api/v2/job_templates/%d/launch/' % template, {})
+            if args.wait:
+                wait_for_job(pool, job['id'], args.poll)
+        return time.time() - start
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(one, range(count)))
+    wall = time.time() - start
+    row = {'workload': workload, 'client': label, 'objects': count, 'wall_s': wall,
+           'objects_per_s': count / wall, 'connections': pool.connections_opened}
+    row.update(('latency_%s' % key, value) for key, value in benchlib.summarize(latencies).items() if key != 'count')
+    return row
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--url', default=os.environ.get('TOWER_HOST'),
+                        help='Tower to benchmark (default: TOWER_HOST, or a mock_tower.py started for the run)')
+    parser.add_argument('--username', default=os.environ.get('TOWER_USERNAME', 'admin'))
+    parser.add_argument('--password', default=os.environ.get('TOWER_PASSWORD', 'password'))
+    parser.add_argument('--workloads', nargs='+', choices=WORKLOADS, default=list(WORKLOADS),
+                        help='Objects to create (default: all)')
+    parser.add_argument('--count', type=int, default=500, help='Objects per workload and client (default: 500)')
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='Requests in flight, and size of the connection pool (default: 8)')
+    parser.add_argument('--job-template', default='Demo Job Template', help='Template to launch')
+    parser.add_argument('--wait', action='store_true', help='Poll every launched job until it finishes')
+    parser.add_argument('--poll', type=float, default=0.1, help='Seconds between job polls with --wait')
+    parser.add_argument('--latency', type=float, default=0.0, help='mock_tower.py --latency (default: 0)')
+    parser.add_argument('--job-duration', type=float, default=0.0, help='mock_tower.py --job-duration (default: 0)')
+    parser.add_argument('--results', help='Write the measurements as JSON to this file (- for stdout)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    server = None
+    url = args.url
+    if not url:
+        server, url = mock_tower.spawn(latency=args.latency, job_duration=args.job_duration)
+    if '://' not in url:
+        url = 'https://' + url
+
+    rows = []
+    try:
+        for workload in args.workloads:
+            for label, keep_alive in (('pooled', True), ('fresh', False)):
+                pool = ConnectionPool(url, args.username, args.password, args.concurrency, keep_alive)
+                try:
+                    rows.append(run_workload(pool, workload, args.count, args.concurrency, label, args))
+                finally:
+                    pool.close()
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    benchlib.print_table(rows, ['workload', 'client', 'objects', 'wall_s', 'objects_per_s', 'connections',
+                                'latency_p50', 'latency_p99'])
+    if args.results:
+        benchlib.write_results(args.results, {'url': url, 'mock': server is not None, 'rows': rows})
+
+
+if __name__ == '__main__':
+    main()
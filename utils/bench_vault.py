@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""Vault decryption cost per run, with and without memoized decryption.
+
+Generates vault_value_* vars with utils/gen_vault_vars.py and runs
+vault_throughput.yml, which templates every one of them on every host,
+against local-connection hosts from inventories/gen_inventory.py:
+
+* inline     -- group_vars/all.yml with inline !vault values (host_group_vars),
+                decrypted whenever they are templated
+* cached     -- the same file in vaulted_group_vars/ loaded by
+                vars_plugins/vault_cached.py, one decryption per ciphertext
+* whole_file -- group_vars/all.yml encrypted as a whole, like vault.yml
+
+Before that every distinct ciphertext is decrypted once in process to report
+the raw cost of a single decryption per vault id.
+
+    python utils/bench_vault.py --values 500 --copies 1 5 --hosts 10 50 --results vault.json
+"""
+from argparse import ArgumentParser
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from ansible.module_utils._text import to_bytes
+from ansible.parsing.vault import VaultLib
+
+import benchlib
+import gen_vault_vars
+
+MODES = ('inline', 'cached', 'whole_file')
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--values', type=int, nargs='+', default=[200], help='Vaulted variables (default: 200)')
+    parser.add_argument('--copies', type=int, nargs='+', default=[1],
+                        help='Variables sharing each ciphertext (default: 1)')
+    parser.add_argument('--hosts', type=int, nargs='+', default=[10], help='Number of hosts (default: 10)')
+    parser.add_argument('--secret', action='append', metavar='ID:PASSWORD',
+                        help='Vault ids to spread the values over (default: %s)'
+                             % ' '.join(gen_vault_vars.DEFAULT_SECRETS))
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES), help='Modes to run (default: all)')
+    parser.add_argument('--forks', type=int, default=5, help='ansible-playbook --forks (default: 5)')
+    parser.add_argument('--ansible-playbook', default='ansible-playbook', help='ansible-playbook executable')
+    parser.add_argument('--results', help='Write the measurements as JSON to this file (- for stdout)')
+    return parser.parse_args()
+
+
+def decrypt_cost(pairs, secrets):
+    """Seconds per decryption of every distinct ciphertext, by vault id."""
+    vault = VaultLib(secrets)
+    timings = {}
+    for ciphertext in sorted(set(ciphertext for _, ciphertext in pairs)):
+        vault_id = ciphertext.splitlines()[0].split(';')[3] if ciphertext.startswith('$ANSIBLE_VAULT;1.2') else 'default'
+        start = time.time()
+        vault.decrypt(to_bytes(ciphertext))
+        timings.setdefault(vault_id, []).append(time.time() - start)
+    return dict((vault_id, benchlib.summarize(values)) for vault_id, values in timings.items())
+
+
+def write_vars(workdir, mode, values, copies, secrets, pairs):
+    for subdir in ('group_vars', 'vaulted_group_vars'):
+        shutil.rmtree(os.path.join(workdir, subdir), ignore_errors=True)
+    subdir = 'vaulted_group_vars' if mode == 'cached' else 'group_vars'
+    os.makedirs(os.path.join(workdir, subdir))
+    if mode == 'whole_file':
+        document = gen_vault_vars.render_whole_file(values, secrets, 32, 0)
+    else:
+        document = gen_vault_vars.render_inline(pairs)
+    with open(os.path.join(workdir, subdir, 'all.yml'), 'w') as f:
+        f.write(document)
+
+
+def run_mode(mode, hosts, workdir, password_files, args):
+    env = {'ANSIBLE_HOST_KEY_CHECKING': 'False',
+           'ANSIBLE_RETRY_FILES_ENABLED': 'False',
+           'ANSIBLE_VARS_PLUGINS': benchlib.repo_path('vars_plugins'),
+           'ANSIBLE_VARS_ENABLED': 'host_group_vars,vault_cached' if mode == 'cached' else 'host_group_vars',
+           'GEN_INVENTORY_HOSTS': str(hosts),
+           'GEN_INVENTORY_GROUPS': '1',
+           'GEN_INVENTORY_UNGROUPED': '0'}
+    cmd = [args.ansible_playbook, '-i', benchlib.repo_path('inventories', 'gen_inventory.py'),
+           '--forks', str(args.forks), '-e', 'ansible_python_interpreter=%s' % sys.executable]
+    for vault_id, path in password_files:
+        cmd.extend(['--vault-id', '%s@%s' % (vault_id, path)])
+    cmd.append(os.path.join(workdir, 'vault_throughput.yml'))
+    run = benchlib.run_measured(cmd, env=env, cwd=workdir)
+    if run['returncode'] != 0:
+        raise SystemExit('%s failed with rc=%s' % (' '.join(cmd), run['returncode']))
+    return run
+
+
+def main():
+    args = parse_args()
+    specs = args.secret or gen_vault_vars.DEFAULT_SECRETS
+    secrets = gen_vault_vars.parse_secrets(specs)
+    workdir = tempfile.mkdtemp(prefix='bench_vault_')
+    rows = []
+    costs = {}
+    try:
+        shutil.copy(benchlib.repo_path('vault_throughput.yml'), workdir)
+        password_files = []
+        for spec in specs:
+            vault_id, _, password = spec.partition(':')
+            path = os.path.join(workdir, 'password_%s' % vault_id)
+            with open(path, 'w') as f:
+                f.write(password + '\n')
+            password_files.append((vault_id, path))
+
+        for values, copies in itertools.product(args.values, args.copies):
+            pairs = list(gen_vault_vars.vaulted_vars(values, secrets, copies, 32, 0))
+            costs['%d_values_%d_copies' % (values, copies)] = decrypt_cost(pairs, secrets)
+            for mode in args.modes:
+                if mode == 'whole_file' and copies != args.copies[0]:
+                    # copies only change inline files
+                    continue
+                write_vars(workdir, mode, values, copies, secrets, pairs)
+                for hosts in args.hosts:
+                    run = run_mode(mode, hosts, workdir, password_files, args)
+                    row = {'mode': mode, 'values': values, 'copies': copies, 'hosts': hosts,
+                           'wall_s': run['wall_s'], 'cpu_s': run['user_s'] + run['sys_s'],
+                           'max_rss_kb': run['max_rss_kb']}
+                    rows.append(row)
+                    sys.stderr.write('%(mode)s values=%(values)s copies=%(copies)s hosts=%(hosts)s: '
+                                     '%(wall_s).2fs\n' % row)
+    finally:
+        shutil.rmtree(workdir)
+
+    for key, by_id in sorted(costs.items()):
+        for vault_id, summary in sorted(by_id.items()):
+            print('%s, vault id %s: %d decryptions, %.2fms each' % (key, vault_id, summary['count'],
+                                                                    summary['mean'] * 1000))
+    benchlib.print_table(rows, ['mode', 'values', 'copies', 'hosts', 'wall_s', 'cpu_s', 'max_rss_kb'])
+    if args.results:
+        benchlib.write_results(args.results, {'decrypt_s': costs, 'runs': rows})
+
+
+if __name__ == '__main__':
+    main()
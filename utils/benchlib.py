@@ -0,0 +1,95 @@
+"""Small helpers shared by the benchmark scripts in this directory."""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+
+def repo_path(*parts):
+    return os.path.join(REPO_ROOT, *parts)
+
+
+def run_measured(cmd, env=None, cwd=None, stdin=None, stdout=None, stderr=None):
+    """Run ``cmd`` to completion and return its wall time and resource usage.
+
+    The child is reaped with os.wait4() so ``max_rss_kb`` is the peak RSS of
+    that process alone rather than the maximum over every child so far.
+    """
+    child_env = None
+    if env:
+        child_env = dict(os.environ)
+        child_env.update(env)
+    devnull = open(os.devnull, 'w')
+    try:
+        start = time.time()
+        proc = subprocess.Popen(cmd, env=child_env, cwd=cwd, stdin=stdin,
+                                stdout=devnull if stdout is None else stdout,
+                                stderr=devnull if stderr is None else stderr)
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.time() - start
+    finally:
+        devnull.close()
+    return {'cmd': cmd,
+            'returncode': os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status),
+            'wall_s': wall,
+            'user_s': usage.ru_utime,
+            'sys_s': usage.ru_stime,
+            'max_rss_kb': usage.ru_maxrss}
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(int(round(pct / 100.0 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def summarize(values):
+    if not values:
+        return {'count': 0}
+    return {'count': len(values),
+            'min': min(values),
+            'mean': sum(values) / len(values),
+            'p50': percentile(values, 50),
+            'p95': percentile(values, 95),
+            'p99': percentile(values, 99),
+            'max': max(values)}
+
+
+def environment():
+    return {'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def write_results(path, results):
+    """Write ``results`` plus a description of the machine as JSON to ``path`` ('-' for stdout)."""
+    document = {'environment': environment(), 'results': results}
+    if path == '-':
+        json.dump(document, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+        return
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def print_table(rows, columns):
+    """Print ``rows`` (dicts) as an aligned text table of ``columns``."""
+    cells = [[_format(row.get(column)) for column in columns] for row in rows]
+    widths = [max([len(column)] + [len(line[i]) for line in cells]) for i, column in enumerate(columns)]
+    print('  '.join(column.ljust(width) for column, width in zip(columns, widths)))
+    for line in cells:
+        print('  '.join(cell.ljust(width) for cell, width in zip(line, widths)))
+
+
+def _format(value):
+    if isinstance(value, float):
+        return '%.4f' % value
+    return '' if value is None else str(value)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+"""Generate a deep and wide inventory directory tree.
+
+inventories/more_inventories/even_more_inventories is two levels deep with a
+script and an INI file per level.  This builds the same kind of tree at any
+size: every directory gets --width subdirectories down to --depth levels, and
+in each directory
+
+* --scripts executable inventory scripts, each emitting --hosts hosts in
+  --groups groups after sleeping --script-delay seconds
+* --ini INI files and --yaml YAML inventory files of --hosts hosts each
+* --plugins inventory plugin configs for the fox plugin of
+  inventories/user_plugins, each with its own host_prefix (set
+  ANSIBLE_INVENTORY_PLUGINS to use them)
+* group_vars/ for the groups defined in that directory
+
+Every source also lists the same --shared hosts, in group ``shared``, so the
+cost of merging one host from many sources shows up as well.
+
+    python utils/gen_inventory_tree.py --output /tmp/tree --depth 3 --width 3 --scripts 2 --ini 1 --yaml 1
+    ansible-inventory -i /tmp/tree --list > /dev/null
+"""
+from argparse import ArgumentParser
+import json
+import os
+import shutil
+
+SCRIPT = '''#!/usr/bin/env python
+# generated by utils/gen_inventory_tree.py
+import json
+import sys
+import time
+
+PREFIX = {prefix!r}
+HOSTS = {hosts}
+GROUPS = {groups}
+SHARED = {shared}
+
+time.sleep({delay})
+if '--host' in sys.argv:
+    print('{{}}')
+    sys.exit(0)
+hosts = ['%s_host_%04d' % (PREFIX, i) for i in range(HOSTS)]
+inventory = {{'_meta': {{'hostvars': dict((host, {{'source': PREFIX}}) for host in hosts)}},
+             'shared': {{'hosts': ['shared_host_%04d' % i for i in range(SHARED)], 'vars': {{'is_shared': True}}}}}}
+for group in range(GROUPS):
+    inventory['%s_group_%d' % (PREFIX, group)] = {{'hosts': hosts[group::GROUPS], 'vars': {{'group_index': group}}}}
+print(json.dumps(inventory))
+'''
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--output', required=True, help='Directory to create the tree in')
+    parser.add_argument('--force', action='store_true', help='Replace --output if it already exists')
+    parser.add_argument('--depth', type=int, default=2, help='Directory levels, 1 is a single directory (default: 2)')
+    parser.add_argument('--width', type=int, default=2, help='Subdirectories per directory (default: 2)')
+    parser.add_argument('--scripts', type=int, default=1, help='Inventory scripts per directory (default: 1)')
+    parser.add_argument('--ini', type=int, default=1, help='INI files per directory (default: 1)')
+    parser.add_argument('--yaml', type=int, default=0, help='YAML inventory files per directory (default: 0)')
+    parser.add_argument('--plugins', type=int, default=0, help='fox plugin configs per directory (default: 0)')
+    parser.add_argument('--hosts', type=int, default=10, help='Hosts per source (default: 10)')
+    parser.add_argument('--groups', type=int, default=2, help='Groups per source (default: 2)')
+    parser.add_argument('--shared', type=int, default=5, help='Hosts every source lists (default: 5)')
+    parser.add_argument('--script-delay', type=float, default=0.0, help='Seconds every script sleeps (default: 0)')
+    return parser.parse_args()
+
+
+def source_hosts(prefix, hosts, groups):
+    """Return {group: [hosts]} for one static source."""
+    names = ['%s_host_%04d' % (prefix, i) for i in range(hosts)]
+    return dict(('%s_group_%d' % (prefix, group), names[group::groups]) for group in range(max(groups, 1)))
+
+
+def write_script(path, prefix, args):
+    with open(path, 'w') as f:
+        f.write(SCRIPT.format(prefix=prefix, hosts=args.hosts, groups=max(args.groups, 1), shared=args.shared,
+                              delay=args.script_delay))
+    os.chmod(path, 0o755)
+
+
+def write_ini(path, prefix, args):
+    lines = []
+    for group, hosts in sorted(source_hosts(prefix, args.hosts, args.groups).items()):
+        lines.append('[%s]' % group)
+        lines.extend('%s source=%s' % (host, prefix) for host in hosts)
+        lines.append('')
+    lines.append('[shared]')
+    lines.extend('shared_host_%04d' % i for i in range(args.shared))
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def write_yaml(path, prefix, args):
+    children = dict((group, {'hosts': dict((host, {'source': prefix}) for host in hosts)})
+                    for group, hosts in source_hosts(prefix, args.hosts, args.groups).items())
+    children['shared'] = {'hosts': dict(('shared_host_%04d' % i, None) for i in range(args.shared))}
+    # JSON is valid YAML and much faster to write for big trees
+    with open(path, 'w') as f:
+        json.dump({'all': {'children': children}}, f, indent=1, sort_keys=True)
+
+
+def write_plugin(path, prefix, args):
+    with open(path, 'w') as f:
+        f.write('plugin: fox\nhost_prefix: %s_\nhost_count: %d\ngroup_count: %d\nfail: false\n'
+                % (prefix, args.hosts, max(args.groups, 1)))
+
+
+def write_group_vars(directory, prefixes, args):
+    group_vars = os.path.join(directory, 'group_vars')
+    os.mkdir(group_vars)
+    for prefix in prefixes:
+        for group in range(max(args.groups, 1)):
+            with open(os.path.join(group_vars, '%s_group_%d' % (prefix, group)), 'w') as f:
+                f.write('%s_group_%d_var: true\n' % (prefix, group))
+
+
+def build(directory, path, args):
+    """Fill ``directory`` (tree position ``path``) and recurse into its subdirectories; return the source count."""
+    os.makedirs(directory)
+    name = 'd%s' % '_'.join(str(i) for i in path) if path else 'root'
+    prefixes = []
+    sources = 0
+    for kind, count, writer, ext in (('script', args.scripts, write_script, '.py'),
+                                     ('ini', args.ini, write_ini, '.ini'),
+                                     ('yaml', args.yaml, write_yaml, '.yml'),
+                                     ('plugin', args.plugins, write_plugin, '.fox.yml')):
+        for i in range(count):
+            prefix = '%s_%s%d' % (name, kind, i)
+            writer(os.path.join(directory, '%s_%d%s' % (kind, i, ext)), prefix, args)
+            if kind != 'plugin':
+                prefixes.append(prefix)
+            sources += 1
+    if prefixes:
+        write_group_vars(directory, prefixes, args)
+    if len(path) + 1 < args.depth:
+        for i in range(args.width):
+            sources += build(os.path.join(directory, 'level_%d_%d' % (len(path) + 1, i)), path + [i], args)
+    return sources
+
+
+def main():
+    args = parse_args()
+    if os.path.exists(args.output):
+        if not args.force:
+            raise SystemExit('%s already exists, pass --force to replace it' % args.output)
+        shutil.rmtree(args.output)
+    sources = build(args.output, [], args)
+    print('%d sources in %s' % (sources, args.output))
+
+
+if __name__ == '__main__':
+    main()
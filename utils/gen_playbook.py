@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+"""Generate the benchmark playbook shapes of this repo and optionally time them.
+
+The shapes follow the hand-expanded playbooks at the top of the repo:
+
+* debug    -- debug-50.yml (``--pause`` adds the one second pauses back)
+* setfact  -- setfact_50.yml, tasks that never spawn a python process
+* ping     -- ping-20.yml, one module execution per task
+* file     -- file_benchmark.yml, creating directories named after md5 sums
+
+With ``--loop-items`` every task loops over that many items.  Without
+``--run`` the playbook is written to ``--output`` (stdout by default).  With
+``--run`` every combination of --tasks, --loop-items, --hosts, --forks and
+--strategy is generated, run against local-connection hosts from
+inventories/gen_inventory.py with the json stdout callback, and summarized:
+
+    python utils/gen_playbook.py --shape ping --tasks 10 50 100 --hosts 1 10 50 \\
+        --forks 5 25 --run --results ping_scaling.json
+"""
+from argparse import ArgumentParser
+from datetime import datetime
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+
+import benchlib
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--shape', choices=sorted(SHAPES), default='debug', help='Playbook shape (default: debug)')
+    parser.add_argument('--tasks', type=int, nargs='+', default=[50], help='Number of tasks (default: 50)')
+    parser.add_argument('--loop-items', type=int, nargs='+', default=[0],
+                        help='Items every task loops over, 0 for no loop (default: 0)')
+    parser.add_argument('--hosts', type=int, nargs='+', default=[1], help='Number of hosts (default: 1)')
+    parser.add_argument('--forks', type=int, nargs='+', default=[5], help='ansible-playbook --forks (default: 5)')
+    parser.add_argument('--strategy', nargs='+', default=['linear'], help='Play strategy (default: linear)')
+    parser.add_argument('--pause', type=int, default=0, help='Seconds to pause after every debug task (default: 0)')
+    parser.add_argument('--file-root', default='/tmp/file_benchmark',
+                        help='Directory the file shape creates its directories in (default: /tmp/file_benchmark)')
+    parser.add_argument('--output', default='-', help='Where to write the playbook without --run (default: stdout)')
+    parser.add_argument('--run', action='store_true', help='Run every combination and record the timings')
+    parser.add_argument('--ansible-playbook', default='ansible-playbook', help='ansible-playbook executable')
+    parser.add_argument('--results', default='-', help='Where to write the --run results as JSON (default: stdout)')
+    return parser.parse_args()
+
+
+def _loop(task, loop_items):
+    if loop_items:
+        task['loop'] = '{{ range(%d) | list }}' % loop_items
+    return task
+
+
+def debug_tasks(count, loop_items, args):
+    for i in range(1, count + 1):
+        msg = '%02d {{ item }}' % i if loop_items else '%02d' % i
+        yield _loop({'debug': {'msg': msg}}, loop_items)
+        if args.pause:
+            yield {'pause': {'seconds': args.pause}}
+
+
+def setfact_tasks(count, loop_items, args):
+    for i in range(count):
+        yield _loop({'set_fact': {'x': '{{ item }}' if loop_items else i}}, loop_items)
+
+
+def ping_tasks(count, loop_items, args):
+    for i in range(1, count + 1):
+        yield _loop({'name': 'ping-%02d' % i, 'ping': None}, loop_items)
+
+
+def file_tasks(count, loop_items, args):
+    items = loop_items or 1
+    for i in range(count):
+        paths = [os.path.join(args.file_root, hashlib.md5(('%d-%d' % (i, item)).encode()).hexdigest())
+                 for item in range(items)]
+        yield {'file': {'path': '{{ item }}', 'state': 'directory', 'mode': '0700'}, 'with_items': paths}
+
+
+SHAPES = {'debug': debug_tasks, 'setfact': setfact_tasks, 'ping': ping_tasks, 'file': file_tasks}
+
+
+def generate(shape, tasks, loop_items, strategy, args):
+    play = {'hosts': 'all', 'gather_facts': False}
+    if strategy != 'linear':
+        play['strategy'] = strategy
+    play['tasks'] = list(SHAPES[shape](tasks, loop_items, args))
+    return [play]
+
+
+def dump(playbook, stream):
+    stream.write('---\n')
+    yaml.safe_dump(playbook, stream, default_flow_style=False, sort_keys=False)
+
+
+def _timestamp(value):
+    return datetime.strptime(value.rstrip('Z'), '%Y-%m-%dT%H:%M:%S.%f')
+
+
+def summarize_run(output):
+    """Per-task latencies and event count from the json stdout callback output."""
+    document = json.loads(output[output.index('{'):])
+    latencies = []
+    events = 0
+    for play in document.get('plays', []):
+        events += 1
+        for task in play.get('tasks', []):
+            duration = task['task'].get('duration', {})
+            if duration.get('start') and duration.get('end'):
+                latencies.append((_timestamp(duration['end']) - _timestamp(duration['start'])).total_seconds())
+            events += 1
+            for result in task.get('hosts', {}).values():
+                events += 1 + len(result.get('results', []))
+    return latencies, events, document.get('stats', {})
+
+
+def run_playbook(path, hosts, forks, args, workdir):
+    env = dict(os.environ,
+               ANSIBLE_STDOUT_CALLBACK='json',
+               ANSIBLE_HOST_KEY_CHECKING='False',
+               ANSIBLE_RETRY_FILES_ENABLED='False',
+               GEN_INVENTORY_HOSTS=str(hosts),
+               GEN_INVENTORY_GROUPS='1',
+               GEN_INVENTORY_UNGROUPED='0')
+    cmd = [args.ansible_playbook, '-i', benchlib.repo_path('inventories', 'gen_inventory.py'),
+           '--forks', str(forks), '-e', 'ansible_python_interpreter=%s' % sys.executable, path]
+    start = time.time()
+    proc = subprocess.Popen(cmd, env=env, cwd=workdir, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            universal_newlines=True)
+    output, errors = proc.communicate()
+    wall = time.time() - start
+    if proc.returncode != 0 and '{' not in output:
+        raise SystemExit('%s failed with rc=%s:\n%s' % (' '.join(cmd), proc.returncode, errors))
+    return proc.returncode, wall, output
+
+
+def run_all(args):
+    workdir = tempfile.mkdtemp(prefix='gen_playbook_')
+    rows = []
+    try:
+        for tasks, loop_items, hosts, forks, strategy in itertools.product(args.tasks, args.loop_items, args.hosts,
+                                                                           args.forks, args.strategy):
+            path = os.path.join(workdir, '%s.yml' % args.shape)
+            with open(path, 'w') as f:
+                dump(generate(args.shape, tasks, loop_items, strategy, args), f)
+            returncode, wall, output = run_playbook(path, hosts, forks, args, workdir)
+            latencies, events, stats = summarize_run(output)
+            row = {'shape': args.shape, 'tasks': tasks, 'loop_items': loop_items, 'hosts': hosts,
+                   'forks': forks, 'strategy': strategy, 'returncode': returncode, 'wall_s': wall,
+                   'events': events, 'events_per_s': events / wall if wall else None,
+                   'task_latency_s': benchlib.summarize(latencies),
+                   'failed_hosts': sorted(host for host, stat in stats.items()
+                                          if stat.get('failures') or stat.get('unreachable'))}
+            rows.append(row)
+            sys.stderr.write('%(shape)s tasks=%(tasks)s loop_items=%(loop_items)s hosts=%(hosts)s forks=%(forks)s '
+                             'strategy=%(strategy)s: %(wall_s).2fs, %(events_per_s).1f events/s\n' % row)
+    finally:
+        shutil.rmtree(workdir)
+    benchlib.write_results(args.results, rows)
+
+
+def main():
+    args = parse_args()
+    if args.run:
+        run_all(args)
+    elif args.output == '-':
+        dump(generate(args.shape, args.tasks[0], args.loop_items[0], args.strategy[0], args), sys.stdout)
+    else:
+        with open(args.output, 'w') as f:
+            dump(generate(args.shape, args.tasks[0], args.loop_items[0], args.strategy[0], args), f)
+
+
+if __name__ == '__main__':
+    main()
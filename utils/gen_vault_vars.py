@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""Generate a vars file with many vaulted values across several vault ids.
+
+Like multivault.yml at inventory scale: N inline ``!vault`` values named
+vault_value_000000, vault_value_000001, ..., encrypted in turn with each
+--secret.  With --copies K every ciphertext is used by K variables in a row,
+the way the same vaulted secret ends up copied across group_vars.  With
+--whole-file the plain YAML is encrypted as a whole instead, like vault.yml.
+
+    python utils/gen_vault_vars.py --values 2000 --secret a:secret1 --secret b:secret2 \\
+        --output group_vars/all.yml --password-dir passwords
+
+and then ``ansible-playbook --vault-id a@passwords/a --vault-id b@passwords/b ...``.
+Encryption runs PBKDF2 once per distinct value, so large files take a while.
+"""
+from argparse import ArgumentParser
+import os
+import random
+import string
+import sys
+
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.parsing.vault import VaultLib, VaultSecret
+
+DEFAULT_SECRETS = ['bench1:secret1', 'bench2:secret2']
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--values', type=int, default=100, help='Number of vaulted variables (default: 100)')
+    parser.add_argument('--secret', action='append', metavar='ID:PASSWORD',
+                        help='Vault id and password, repeat for more ids (default: %s)' % ' '.join(DEFAULT_SECRETS))
+    parser.add_argument('--copies', type=int, default=1,
+                        help='Variables sharing each ciphertext (default: 1, every value distinct)')
+    parser.add_argument('--value-size', type=int, default=32, help='Characters per plaintext value (default: 32)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the plaintext values (default: 0)')
+    parser.add_argument('--whole-file', action='store_true',
+                        help='Encrypt the whole file with the first secret instead of every value')
+    parser.add_argument('--output', default='-', help='File to write (default: stdout)')
+    parser.add_argument('--password-dir', help='Also write every password to <password-dir>/<id>')
+    return parser.parse_args()
+
+
+def parse_secrets(specs):
+    secrets = []
+    for spec in specs:
+        vault_id, sep, password = spec.partition(':')
+        if not sep or not vault_id:
+            raise SystemExit('--secret expects ID:PASSWORD, got %r' % spec)
+        secrets.append((vault_id, VaultSecret(to_bytes(password))))
+    return secrets
+
+
+def plaintexts(count, size, seed):
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits
+    for _ in range(count):
+        yield ''.join(rng.choice(alphabet) for _ in range(size))
+
+
+def vaulted_vars(values, secrets, copies, size, seed):
+    """Yield (name, ciphertext) pairs, the ciphertext changing every ``copies`` names."""
+    vault = VaultLib(secrets)
+    copies = max(copies, 1)
+    distinct = (values + copies - 1) // copies
+    index = 0
+    for n, plaintext in enumerate(plaintexts(distinct, size, seed)):
+        vault_id, secret = secrets[n % len(secrets)]
+        ciphertext = to_text(vault.encrypt(plaintext, secret=secret, vault_id=vault_id))
+        for _ in range(min(copies, values - index)):
+            yield 'vault_value_%06d' % index, ciphertext
+            index += 1
+
+
+def render_inline(pairs):
+    lines = ['---']
+    for name, ciphertext in pairs:
+        lines.append('%s: !vault |' % name)
+        lines.extend('  ' + line for line in ciphertext.splitlines())
+    return '\n'.join(lines) + '\n'
+
+
+def render_whole_file(values, secrets, size, seed):
+    vault_id, secret = secrets[0]
+    body = '---\n' + ''.join('vault_value_%06d: %s\n' % (index, plaintext)
+                             for index, plaintext in enumerate(plaintexts(values, size, seed)))
+    return to_text(VaultLib(secrets).encrypt(body, secret=secret, vault_id=vault_id))
+
+
+def main():
+    args = parse_args()
+    secrets = parse_secrets(args.secret or DEFAULT_SECRETS)
+    if args.whole_file:
+        document = render_whole_file(args.values, secrets, args.value_size, args.seed)
+    else:
+        document = render_inline(vaulted_vars(args.values, secrets, args.copies, args.value_size, args.seed))
+
+    if args.output == '-':
+        sys.stdout.write(document)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(document)
+
+    if args.password_dir:
+        if not os.path.isdir(args.password_dir):
+            os.makedirs(args.password_dir)
+        for spec in args.secret or DEFAULT_SECRETS:
+            vault_id, _, password = spec.partition(':')
+            with open(os.path.join(args.password_dir, vault_id), 'w') as f:
+                f.write(password + '\n')
+
+
+if __name__ == '__main__':
+    main()
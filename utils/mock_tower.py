@@ -0,0 +1,392 @@
+#!/usr/bin/env python
+"""In-memory stand-in for the Tower/AWX REST API, for offline runs and benchmarks.
+
+Implements just enough of /api/v2/ for the tower_modules roles and for bulk
+object creation benchmarks, on nothing but asyncio:
+
+* every ``/api/v2/<collection>/`` is a generic, paginated collection with
+  create (POST), field equality filters (``?name=...``), and
+  GET/PUT/PATCH/DELETE on ``/api/v2/<collection>/<id>/``
+* ``launch``, ``update``, ``relaunch`` and ``cancel`` on a template, project
+  or job create or cancel jobs, which report ``successful`` after
+  ``--job-duration`` seconds
+* any other ``/<collection>/<id>/<related>/`` POST (de)associates objects
+* ``ping``, ``config``, ``me`` and ``settings`` return plausible documents
+* ``POST /api/v2/tokens/`` hands out the personal token awx.awx asks for
+  when given a username and password, and ``/api/o/token/`` the OAuth2 token
+  of ``tower-cli login``; tokens are never checked
+
+Connections are kept alive (HTTP/1.1) and every request can be delayed with
+``--latency``/``--jitter`` to stand in for a remote Tower:
+
+    python utils/mock_tower.py --port 8013 --latency 0.01
+    TOWER_HOST=http://127.0.0.1:8013 TOWER_USERNAME=admin TOWER_PASSWORD=password ansible-playbook ...
+"""
+from argparse import ArgumentParser
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+VERSION = '17.0.0'
+API = '/api/v2/'
+# the ``type`` of the objects in every collection the roles and benchmarks use
+TYPES = {'organizations': 'organization', 'users': 'user', 'teams': 'team', 'credentials': 'credential',
+         'credential_types': 'credential_type', 'inventories': 'inventory', 'hosts': 'host', 'groups': 'group',
+         'inventory_sources': 'inventory_source', 'inventory_updates': 'inventory_update',
+         'projects': 'project', 'project_updates': 'project_update', 'job_templates': 'job_template',
+         'jobs': 'job', 'workflow_job_templates': 'workflow_job_template', 'workflow_jobs': 'workflow_job',
+         'workflow_job_template_nodes': 'workflow_job_template_node', 'labels': 'label',
+         'notification_templates': 'notification_template', 'roles': 'role', 'schedules': 'schedule',
+         'tokens': 'o_auth2_access_token', 'applications': 'o_auth2_application'}
+JOB_COLLECTIONS = {'job_templates': 'jobs', 'workflow_job_templates': 'workflow_jobs',
+                   'projects': 'project_updates', 'inventory_sources': 'inventory_updates',
+                   'jobs': 'jobs', 'workflow_jobs': 'workflow_jobs'}
+# the launch/update/... endpoints listed under ``related`` of these objects
+RELATED_ACTIONS = {'job_templates': ('launch',), 'workflow_job_templates': ('launch',),
+                   'projects': ('update',), 'inventory_sources': ('update',),
+                   'jobs': ('relaunch', 'cancel'), 'workflow_jobs': ('relaunch', 'cancel'),
+                   'project_updates': ('cancel',), 'inventory_updates': ('cancel',)}
+# roles created with every object, listed in its ``summary_fields.object_roles``
+OBJECT_ROLES = {'organizations': ('admin', 'execute', 'project_admin', 'inventory_admin', 'credential_admin',
+                                  'workflow_admin', 'notification_admin', 'job_template_admin', 'auditor',
+                                  'member', 'read', 'approval'),
+                'teams': ('admin', 'member', 'read'),
+                'projects': ('admin', 'use', 'update', 'read'),
+                'inventories': ('admin', 'update', 'adhoc', 'use', 'read'),
+                'credentials': ('admin', 'use', 'read'),
+                'job_templates': ('admin', 'execute', 'read'),
+                'workflow_job_templates': ('admin', 'execute', 'read', 'approval')}
+_PROMPTS = ('ask_scm_branch_on_launch', 'ask_diff_mode_on_launch', 'ask_variables_on_launch', 'ask_limit_on_launch',
+            'ask_tags_on_launch', 'ask_skip_tags_on_launch', 'ask_job_type_on_launch', 'ask_verbosity_on_launch',
+            'ask_inventory_on_launch', 'ask_credential_on_launch')
+# fields the modules read from objects created without them
+DEFAULTS = {'job_templates': dict(dict.fromkeys(_PROMPTS, False), survey_enabled=False),
+            'workflow_job_templates': {'ask_variables_on_launch': False, 'ask_inventory_on_launch': False,
+                                       'ask_scm_branch_on_launch': False, 'ask_limit_on_launch': False,
+                                       'survey_enabled': False}}
+REASONS = {200: 'OK', 201: 'Created', 202: 'Accepted', 204: 'No Content', 400: 'Bad Request',
+           404: 'Not Found', 405: 'Method Not Allowed'}
+IGNORED_QUERY = ('page', 'page_size', 'order_by', 'format', 'search')
+
+
+def _timestamp(when):
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(when)) + '.%06dZ' % int(when % 1 * 1e6)
+
+
+class Store(object):
+    """Collections of objects keyed by id, seeded with the Demo objects the roles expect."""
+
+    def __init__(self, job_duration=0.0):
+        self.job_duration = job_duration
+        self.collections = {}
+        self.related = {}
+        self.settings = {'AWX_PROOT_SHOW_PATHS': [], 'AWX_PROOT_BASE_PATH': '/tmp',
+                         'TOWER_URL_BASE': 'http://127.0.0.1'}
+        self._next_id = 1
+        self.seed()
+
+    def seed(self):
+        org = self.create('organizations', {'name': 'Default'})
+        self.create('users', {'username': 'admin', 'is_superuser': True})
+        cred = self.create('credentials', {'name': 'Demo Credential', 'credential_type': 1, 'organization': None})
+        inventory = self.create('inventories', {'name': 'Demo Inventory', 'organization': org['id']})
+        self.create('hosts', {'name': 'localhost', 'inventory': inventory['id']})
+        project = self.create('projects', {'name': 'Demo Project', 'organization': org['id'], 'scm_type': 'git',
+                                           'status': 'successful'})
+        self.create('job_templates', {'name': 'Demo Job Template', 'project': project['id'],
+                                      'inventory': inventory['id'], 'credential': cred['id'],
+                                      'playbook': 'hello_world.yml'})
+        self.create('credential_types', {'name': 'Machine', 'kind': 'ssh', 'managed_by_tower': True})
+
+    def collection(self, name):
+        return self.collections.setdefault(name, {})
+
+    def create(self, collection, data):
+        obj_id = self._next_id
+        self._next_id += 1
+        now = time.time()
+        obj = dict(DEFAULTS.get(collection, {}))
+        obj.update(data)
+        url = '%s%s/%d/' % (API, collection, obj_id)
+        obj.update({'id': obj_id,
+                    'type': TYPES.get(collection, collection),
+                    'url': url,
+                    'related': dict((action, '%s%s/' % (url, action))
+                                    for action in RELATED_ACTIONS.get(collection, ())),
+                    'summary_fields': {},
+                    'created': _timestamp(now),
+                    'modified': _timestamp(now)})
+        self.collection(collection)[obj_id] = obj
+        if collection in OBJECT_ROLES:
+            obj['summary_fields']['object_roles'] = dict(
+                ('%s_role' % role, {'id': self.create('roles', {'name': role})['id'], 'name': role})
+                for role in OBJECT_ROLES[collection])
+        return obj
+
+    def get(self, collection, obj_id):
+        obj = self.collection(collection).get(obj_id)
+        if obj is not None and collection in set(JOB_COLLECTIONS.values()):
+            self._advance(obj)
+        return obj
+
+    def _advance(self, job):
+        if job.get('status') in ('pending', 'running') and time.time() >= job['_started'] + self.job_duration:
+            job.update({'status': 'successful', 'failed': False, 'finished': _timestamp(time.time()),
+                        'elapsed': self.job_duration})
+
+    def query(self, collection, filters):
+        results = []
+        for obj_id in sorted(self.collection(collection)):
+            obj = self.get(collection, obj_id)
+            if all(_matches(obj, field, value) for field, value in filters):
+                results.append(obj)
+        return results
+
+    def token(self, data):
+        now = time.time()
+        return self.create('tokens', dict(data, token='%030x' % random.getrandbits(120), refresh_token=None,
+                                          expires=_timestamp(now + 3600 * 24 * 365), scope=data.get('scope', 'write')))
+
+    def launch(self, collection, template, data):
+        job = self.create(JOB_COLLECTIONS[collection], dict(data, name=template.get('name'), status='pending',
+                                                           failed=False,
+                                                           job_template=template.get('job_template', template['id']),
+                                                           started=_timestamp(time.time()), finished=None))
+        job['_started'] = time.time()
+        job['job'] = job['id']
+        return job
+
+
+def _matches(obj, field, value):
+    for suffix in ('__iexact', '__exact'):
+        if field.endswith(suffix):
+            field = field[:-len(suffix)]
+            if suffix == '__iexact':
+                return str(obj.get(field, '')).lower() == value.lower()
+    if field.endswith('__in'):
+        return str(obj.get(field[:-len('__in')])) in value.split(',')
+    if field.endswith('__isnull'):
+        return (obj.get(field[:-len('__isnull')]) is None) == (value.lower() == 'true')
+    current = obj.get(field)
+    if isinstance(current, bool):
+        return str(current).lower() == value.lower()
+    return str(current) == value
+
+
+def _public(obj):
+    return dict((key, value) for key, value in obj.items() if not key.startswith('_'))
+
+
+class MockTower(object):
+
+    def __init__(self, store, latency=0.0, jitter=0.0):
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0) or 0))
+                if self.latency or self.jitter:
+                    await asyncio.sleep(self.latency + random.random() * self.jitter)
+                status, payload = self.dispatch(method, target, body)
+                self.requests += 1
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                self.respond(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def respond(self, writer, status, payload, keep_alive):
+        body = b'' if payload is None else json.dumps(payload).encode('utf-8')
+        head = ['HTTP/1.1 %d %s' % (status, REASONS.get(status, 'Unknown')),
+                'Content-Type: application/json',
+                'Content-Length: %d' % len(body),
+                'X-API-Product-Name: AWX',
+                'X-API-Product-Version: %s' % VERSION,
+                'Connection: %s' % ('keep-alive' if keep_alive else 'close')]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+
+    def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        parts = [part for part in url.path.split('/') if part]
+        if parts[:2] == ['api', 'o']:
+            return self.dispatch_oauth(method, parts[2:], dict(parse_qsl(body.decode('utf-8'))))
+        try:
+            data = json.loads(body.decode('utf-8')) if body else {}
+        except ValueError:
+            return 400, {'detail': 'JSON parse error'}
+        if parts[:1] != ['api']:
+            return 404, {'detail': 'Not found.'}
+        if len(parts) == 1:
+            return 200, {'current_version': API, 'available_versions': {'v2': API}}
+        parts = parts[2:]
+        if not parts:
+            return 200, dict((name, '%s%s/' % (API, name)) for name in sorted(self.store.collections))
+        if parts[0] in ('ping', 'config'):
+            return 200, {'version': VERSION, 'ha': False, 'active_node': 'mock_tower', 'instances': []}
+        if parts[0] == 'me':
+            return 200, self._page(url.path, [self.store.query('users', [('username', 'admin')])[0]], {})
+        if parts[0] == 'settings':
+            if method in ('PATCH', 'PUT'):
+                self.store.settings.update(data)
+            return 200, dict(self.store.settings)
+        return self.dispatch_collection(method, url.path, parts, dict(parse_qsl(url.query)), data)
+
+    def dispatch_oauth(self, method, parts, form):
+        """The form encoded /api/o/ endpoints of ``tower-cli login``."""
+        if parts == ['token'] and method == 'POST':
+            token = self.store.token({'scope': form.get('scope', 'write')})
+            return 201, {'access_token': token['token'], 'token_type': 'Bearer', 'expires_in': 3600 * 24 * 365,
+                         'refresh_token': None, 'scope': token['scope']}
+        if parts == ['revoke_token'] and method == 'POST':
+            return 200, None
+        return 404, {'detail': 'Not found.'}
+
+    def dispatch_collection(self, method, path, parts, query, data):
+        collection = parts[0]
+        if len(parts) == 1:
+            if method == 'GET':
+                filters = [(key, value) for key, value in query.items() if key not in IGNORED_QUERY]
+                return 200, self._page(path, self.store.query(collection, filters), query)
+            if method == 'POST' and collection == 'tokens':
+                return 201, _public(self.store.token(data))
+            if method == 'POST':
+                return 201, _public(self.store.create(collection, data))
+            return 405, {'detail': 'Method "%s" not allowed.' % method}
+
+        try:
+            obj_id = int(parts[1])
+        except ValueError:
+            return 404, {'detail': 'Not found.'}
+        obj = self.store.get(collection, obj_id)
+        if obj is None:
+            return 404, {'detail': 'Not found.'}
+
+        if len(parts) == 2:
+            if method == 'GET':
+                return 200, _public(obj)
+            if method in ('PATCH', 'PUT'):
+                obj.update(data)
+                obj['modified'] = _timestamp(time.time())
+                return 200, _public(obj)
+            if method == 'DELETE':
+                del self.store.collection(collection)[obj_id]
+                return 204, None
+            return 405, {'detail': 'Method "%s" not allowed.' % method}
+
+        action = parts[2]
+        if action in ('launch', 'update', 'relaunch') and collection in JOB_COLLECTIONS:
+            if method == 'GET':
+                return 200, {'can_start_without_user_input': True, 'can_update': True, 'defaults': {}}
+            job = self.store.launch(collection, obj, data)
+            if action == 'relaunch':
+                # ``job`` is the new job, not the one relaunched
+                return 201, _public(job)
+            return 201, dict(_public(job), **{TYPES[collection]: obj_id})
+        if action == 'cancel':
+            if method == 'GET':
+                return 200, {'can_cancel': obj.get('status') in ('pending', 'running')}
+            obj.update({'status': 'canceled', 'failed': True, 'finished': _timestamp(time.time())})
+            return 202, None
+
+        related = self.store.related.setdefault((collection, obj_id, action), [])
+        if method == 'GET':
+            return 200, self._page(path, related, query)
+        if data.get('disassociate'):
+            related[:] = [item for item in related if item.get('id') != data.get('id')]
+        elif data.get('id') is not None:
+            related.append({'id': data['id']})
+        else:
+            item = _public(self.store.create(action, data))
+            related.append(item)
+            return 201, item
+        return 204, None
+
+    def _page(self, path, results, query):
+        page_size = int(query.get('page_size', 25))
+        page = int(query.get('page', 1))
+        chunk = results[(page - 1) * page_size:page * page_size]
+        more = page * page_size < len(results)
+
+        def link(number):
+            # like AWX: the full collection path, keeping the filters of the request
+            return '%s?%s' % (path, urlencode(dict(query, page=number, page_size=page_size)))
+
+        return {'count': len(results),
+                'next': link(page + 1) if more else None,
+                'previous': link(page - 1) if page > 1 else None,
+                'results': [_public(obj) for obj in chunk]}
+
+
+async def serve(host, port, latency=0.0, jitter=0.0, job_duration=0.0, ready=None):
+    tower = MockTower(Store(job_duration), latency, jitter)
+    server = await asyncio.start_server(tower.handle_connection, host, port)
+    if ready is not None:
+        ready(server.sockets[0].getsockname()[1])
+    async with server:
+        await server.serve_forever()
+
+
+def spawn(latency=0.0, jitter=0.0, job_duration=0.0):
+    """Start this server in a child process on a free port and return (process, url)."""
+    cmd = [sys.executable, os.path.realpath(__file__), '--port', '0', '--latency', str(latency),
+           '--jitter', str(jitter), '--job-duration', str(job_duration)]
+    server = subprocess.Popen(cmd, stdout=subprocess.PIPE, universal_newlines=True)
+    url = server.stdout.readline().strip()
+    if not url:
+        server.wait()
+        raise RuntimeError('mock_tower.py exited with rc=%s' % server.returncode)
+    return server, url
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8013, help='Port to listen on, 0 for any (default: 8013)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every request (default: 0)')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='Up to this many random seconds added on top of --latency (default: 0)')
+    parser.add_argument('--job-duration', type=float, default=0.0,
+                        help='Seconds a launched job stays pending before it is successful (default: 0)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    def ready(port):
+        # a single line on stdout so a parent process knows where to connect
+        sys.stdout.write('http://%s:%d\n' % (args.host, port))
+        sys.stdout.flush()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.latency, args.jitter, args.job_duration, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
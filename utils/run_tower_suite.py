@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+"""Run the tower_modules test roles in parallel, in dependency order.
+
+tower_modules/main.yml includes every tower_<role>/tasks/main.yml one after
+the other.  Most roles work on objects of their own, so this runner works out
+which roles actually interfere and runs the rest side by side, each as its
+own ``ansible-playbook tower_modules/wrapper.yml`` process:
+
+* every tower_* task is scanned for the Tower objects it touches: the object
+  it manages (``name``/``username``) is written, or read in check mode, and
+  objects it points at (``project``, ``inventory``, ``job_template``, ...) are
+  read.  Templated names, e.g. from the randstr lookup, are private to a role.
+* two roles conflict when they touch the same object and at least one of them
+  writes it; the one listed first in main.yml then runs first.
+* roles in EXCLUSIVE change state every other role depends on and run alone,
+  after everything listed before them and before everything listed after.
+
+The suite is expected to take as long as its critical path instead of the sum
+of all roles.  TOWER_HOST, TOWER_USERNAME and TOWER_PASSWORD are passed
+through, or set with --tower-host/--tower-username/--tower-password.  With
+--mock every role talks to a utils/mock_tower.py started for the run instead,
+so the suite can be run and timed without a Tower.  The mock only speaks
+plain HTTP, so the roles in MOCK_SKIPPED, which expect a TLS handshake to
+fail, are skipped and reported as such.
+
+    python utils/run_tower_suite.py --jobs 8 --results tower_suite.json
+    python utils/run_tower_suite.py --plan   # print the dependency order only
+    python utils/run_tower_suite.py --mock --mock-latency 0.01
+"""
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import glob
+import os
+import subprocess
+import sys
+import time
+
+import yaml
+
+import benchlib
+import mock_tower
+
+SUITE_DIR = benchlib.repo_path('tower_modules')
+
+# roles that change global state: the tower_cli config file, Tower settings, or every asset at once
+EXCLUSIVE = {
+    'common': 'rewrites ~/.tower_cli.cfg, which every tower module reads',
+    'settings': 'changes Tower settings that apply to every job',
+    'send': 'imports assets in bulk',
+    'receive': 'exports every asset',
+}
+
+# roles that cannot pass against mock_tower.py
+MOCK_SKIPPED = {
+    'common': 'expects TOWER_CERTIFICATE=/dev/null to fail the TLS handshake, the mock is plain HTTP',
+}
+
+# module parameters naming another Tower object, mapped to that object's type
+REFERENCES = {
+    'organization': 'organization',
+    'project': 'project',
+    'inventory': 'inventory',
+    'credential': 'credential',
+    'job_template': 'job_template',
+    'workflow_template': 'workflow_template',
+    'team': 'team',
+    'user': 'user',
+}
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--roles', nargs='+', help='Roles to run (default: every role listed in main.yml)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 4,
+                        help='Maximum number of ansible-playbook processes at once (default: CPU count)')
+    parser.add_argument('--plan', action='store_true', help='Print the dependencies and exit without running')
+    parser.add_argument('--collection', default='awx.awx', help='Collection providing the tower modules')
+    parser.add_argument('--tower-host', help='TOWER_HOST for every role')
+    parser.add_argument('--tower-username', help='TOWER_USERNAME for every role')
+    parser.add_argument('--tower-password', help='TOWER_PASSWORD for every role')
+    parser.add_argument('--mock', action='store_true', help='Run against a local mock_tower.py instead of TOWER_HOST')
+    parser.add_argument('--mock-latency', type=float, default=0.0,
+                        help='Seconds the mock Tower adds to every request (default: 0)')
+    parser.add_argument('--ansible-playbook', default='ansible-playbook', help='ansible-playbook executable')
+    parser.add_argument('--log-dir', help='Keep the output of every role in <log-dir>/<role>.log')
+    parser.add_argument('--results', help='Write the report as JSON to this file (- for stdout)')
+    return parser.parse_args()
+
+
+def suite_roles():
+    with open(os.path.join(SUITE_DIR, 'main.yml')) as f:
+        playbook = yaml.safe_load(f)
+    return [item for play in playbook for task in play.get('tasks', []) for item in task.get('loop', [])]
+
+
+def iter_tasks(tasks):
+    for task in tasks or []:
+        if not isinstance(task, dict):
+            continue
+        yield task
+        for section in ('block', 'rescue', 'always'):
+            for nested in iter_tasks(task.get(section)):
+                yield nested
+
+
+def _literal(value):
+    return isinstance(value, str) and '{{' not in value
+
+
+def role_resources(role):
+    """Return {(type, name): 'read' or 'write'} for the Tower objects a role touches."""
+    resources = {}
+
+    def touch(kind, name, mode):
+        if _literal(name) and resources.get((kind, name)) != 'write':
+            resources[(kind, name)] = mode
+
+    for path in sorted(glob.glob(os.path.join(SUITE_DIR, 'tower_%s' % role, 'tasks', '*.yml'))):
+        with open(path) as f:
+            tasks = yaml.safe_load(f)
+        for task in iter_tasks(tasks):
+            module = next((key for key in task if key.startswith('tower_')), None)
+            if module is None or not isinstance(task[module], dict):
+                continue
+            params = task[module]
+            kind = module[len('tower_'):]
+            touch(kind, params.get('name', params.get('username')), 'read' if task.get('check_mode') else 'write')
+            for param, target in REFERENCES.items():
+                if param in params and target != kind:
+                    touch(target, params[param], 'read')
+    return resources
+
+
+def dependencies(roles):
+    """Map every role to the roles that have to finish before it starts."""
+    resources = dict((role, role_resources(role)) for role in roles)
+    after = dict((role, set()) for role in roles)
+    for i, role in enumerate(roles):
+        for earlier in roles[:i]:
+            if role in EXCLUSIVE or earlier in EXCLUSIVE:
+                after[role].add(earlier)
+                continue
+            shared = set(resources[role]) & set(resources[earlier])
+            if any('write' in (resources[role][key], resources[earlier][key]) for key in shared):
+                after[role].add(earlier)
+    return after
+
+
+def critical_path(after, durations):
+    finish = {}
+
+    def earliest_finish(role):
+        if role not in finish:
+            finish[role] = durations.get(role, 0.0) + max([earliest_finish(dep) for dep in after[role]] or [0.0])
+        return finish[role]
+
+    last = max(after, key=earliest_finish) if after else None
+    path = []
+    while last is not None:
+        path.append(last)
+        last = max(after[last], key=earliest_finish) if after[last] else None
+    return list(reversed(path)), max(finish.values()) if finish else 0.0
+
+
+def run_role(role, args, env, suite_start):
+    started = time.time() - suite_start
+    cmd = [args.ansible_playbook, os.path.join(SUITE_DIR, 'wrapper.yml'),
+           '-e', 'tower_module_under_test=%s' % role, '-e', 'collection_id=%s' % args.collection]
+    log = open(os.path.join(args.log_dir, '%s.log' % role), 'w') if args.log_dir else None
+    try:
+        run = benchlib.run_measured(cmd, env=env, cwd=SUITE_DIR, stdout=log, stderr=subprocess.STDOUT if log else None)
+    finally:
+        if log:
+            log.close()
+    return role, started, run
+
+
+def run_suite(roles, after, args):
+    env = {}
+    for option, variable in (('tower_host', 'TOWER_HOST'), ('tower_username', 'TOWER_USERNAME'),
+                             ('tower_password', 'TOWER_PASSWORD')):
+        if getattr(args, option):
+            env[variable] = getattr(args, option)
+    if args.log_dir and not os.path.isdir(args.log_dir):
+        os.makedirs(args.log_dir)
+
+    pending = list(roles)
+    done = {}
+    suite_start = time.time()
+    with ThreadPoolExecutor(max_workers=max(args.jobs, 1)) as executor:
+        running = {}
+        while pending or running:
+            for role in [r for r in pending if after[r].issubset(done)]:
+                pending.remove(role)
+                running[executor.submit(run_role, role, args, env, suite_start)] = role
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                del running[future]
+                role, started, run = future.result()
+                done[role] = {'role': role, 'returncode': run['returncode'], 'start_s': started,
+                              'wall_s': run['wall_s'], 'max_rss_kb': run['max_rss_kb'],
+                              'after': sorted(after[role])}
+                sys.stderr.write('%-20s rc=%s %7.2fs\n' % (role, run['returncode'], run['wall_s']))
+    return [done[role] for role in roles], time.time() - suite_start
+
+
+def main():
+    args = parse_args()
+    roles = args.roles or suite_roles()
+    missing = [role for role in roles if not os.path.isdir(os.path.join(SUITE_DIR, 'tower_%s' % role))]
+    for role in missing:
+        sys.stderr.write('skipping %s: tower_modules/tower_%s does not exist\n' % (role, role))
+    if args.mock:
+        for role in [r for r in roles if r in MOCK_SKIPPED and r not in missing]:
+            sys.stderr.write('skipping %s with --mock: %s\n' % (role, MOCK_SKIPPED[role]))
+            missing.append(role)
+    roles = [role for role in roles if role not in missing]
+    after = dependencies(roles)
+
+    if args.plan:
+        for role in roles:
+            print('%-20s after: %s' % (role, ', '.join(sorted(after[role])) or '-'))
+        return
+
+    server = None
+    if args.mock:
+        server, args.tower_host = mock_tower.spawn(latency=args.mock_latency)
+        args.tower_username, args.tower_password = 'admin', 'password'
+    try:
+        rows, wall = run_suite(roles, after, args)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    durations = dict((row['role'], row['wall_s']) for row in rows)
+    path, path_s = critical_path(after, durations)
+    benchlib.print_table(rows, ['role', 'returncode', 'start_s', 'wall_s', 'max_rss_kb'])
+    report = {'roles': rows,
+              'skipped': missing,
+              'failed': [row['role'] for row in rows if row['returncode'] != 0],
+              'wall_s': wall,
+              'serial_sum_s': sum(durations.values()),
+              'critical_path': path,
+              'critical_path_s': path_s}
+    print('suite wall %.1fs, serial sum %.1fs, critical path %.1fs: %s' % (
+        wall, report['serial_sum_s'], path_s, ' -> '.join(path)))
+    if args.results:
+        benchlib.write_results(args.results, report)
+    if report['failed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
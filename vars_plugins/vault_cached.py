@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = """
+    vars: vault_cached
+    short_description: Loads vaulted group and host vars, decrypting every ciphertext once per run
+    description:
+        - Loads YAML files from vaulted_group_vars/ and vaulted_host_vars/ next to the inventory
+          source or playbook, exactly like host_group_vars does for group_vars/ and host_vars/.
+        - Inline !vault values are replaced by their plaintext before the vars are returned.
+          Every distinct ciphertext is decrypted once per ansible run and remembered, where an
+          inline vault value in group_vars is decrypted again every time it is templated, for
+          every host.
+        - Plaintext is only held in the memory of the controller process, nothing is written.
+        - Enable with ANSIBLE_VARS_ENABLED=host_group_vars,vault_cached.
+    version_added: "2.10"
+    requirements:
+        - enable in configuration
+    options:
+        stage:
+            ini:
+                - key: stage
+                  section: vars_vault_cached
+            env:
+                - name: ANSIBLE_VARS_PLUGIN_STAGE
+    extends_documentation_fragment:
+        - vars_plugin_staging
+"""
+
+import os
+
+from ansible.errors import AnsibleParserError
+from ansible.inventory.group import Group
+from ansible.inventory.host import Host
+from ansible.module_utils._text import to_bytes, to_native, to_text
+from ansible.module_utils.common._collections_compat import Mapping
+from ansible.parsing.yaml.objects import AnsibleVaultEncryptedUnicode
+from ansible.plugins.vars import BaseVarsPlugin
+from ansible.utils.vars import combine_vars
+
+FOUND = {}
+# ciphertext -> plaintext, for the lifetime of the controller process
+DECRYPTED = {}
+
+
+def decrypt(value, stats):
+    ciphertext = value._ciphertext
+    if ciphertext not in DECRYPTED:
+        stats['decrypted'] += 1
+        DECRYPTED[ciphertext] = to_text(value.vault.decrypt(ciphertext, obj=value))
+    else:
+        stats['reused'] += 1
+    return DECRYPTED[ciphertext]
+
+
+def unvault(data, stats):
+    if isinstance(data, AnsibleVaultEncryptedUnicode):
+        return decrypt(data, stats)
+    if isinstance(data, Mapping):
+        return dict((key, unvault(value, stats)) for key, value in data.items())
+    if isinstance(data, list):
+        return [unvault(value, stats) for value in data]
+    return data
+
+
+class VarsModule(BaseVarsPlugin):
+
+    REQUIRES_ENABLED = True
+
+    def get_vars(self, loader, path, entities, cache=True):
+        if not isinstance(entities, list):
+            entities = [entities]
+
+        super(VarsModule, self).get_vars(loader, path, entities)
+
+        data = {}
+        stats = {'decrypted': 0, 'reused': 0}
+        for entity in entities:
+            if isinstance(entity, Host):
+                subdir = 'vaulted_host_vars'
+            elif isinstance(entity, Group):
+                subdir = 'vaulted_group_vars'
+            else:
+                raise AnsibleParserError("Supplied entity must be Host or Group, got %s instead" % (type(entity)))
+
+            # avoid 'chroot' type inventory hostnames /path/to/chroot
+            if entity.name.startswith(os.path.sep):
+                continue
+            try:
+                opath = to_text(os.path.realpath(to_bytes(os.path.join(self._basedir, subdir))))
+                key = '%s.%s' % (entity.name, opath)
+                if cache and key in FOUND:
+                    found_files = FOUND[key]
+                else:
+                    found_files = loader.find_vars_files(opath, entity.name) if os.path.isdir(opath) else []
+                    FOUND[key] = found_files
+
+                for found in found_files:
+                    new_data = loader.load_from_file(found, cache=True, unsafe=True)
+                    if new_data:  # ignore empty files
+                        data = combine_vars(data, unvault(new_data, stats))
+            except Exception as e:
+                raise AnsibleParserError(to_native(e))
+
+        if stats['decrypted'] or stats['reused']:
+            self._display.vvv('vault_cached: %(decrypted)d values decrypted, %(reused)d reused' % stats)
+        return data